@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Batch Backfill - Siembra masiva de ideas con la Batch API de OpenAI
+- Escribe un JSONL con una petición de chat completion por idea (mismo
+  prompt que el generador, con un enfoque por tema/tipo para variar)
+- Lo sube (files.create), crea el batch (batches.create) y lo sondea hasta
+  que termina; el estado queda en data/batches/ para poder reanudar (--resume)
+- Los resultados pasan por los mismos filtros que la generación normal
+  (campos, score mínimo, duplicados) y las ideas aceptadas se insertan en el
+  CSV en una sola escritura
+FakeBatchClient: servidor de Batch API local que ejecuta cada línea contra
+el cliente de chat configurado (con LLM_MODE=replay, sin red)
+"""
+import os
+import json
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+from file_utils import atomic_write_json
+
+BATCH_DIR = 'data/batches'
+ENDPOINT = '/v1/chat/completions'
+FINAL_STATUSES = ('completed', 'failed', 'expired', 'cancelled')
+
+
+class FakeBatchClient:
+    """
+    Batch API en local (files.create/content, batches.create/retrieve).
+    El batch pasa por validating -> in_progress -> completed a lo largo de
+    `steps` consultas; al completarse, cada petición se ejecuta contra
+    completions_client y se genera el fichero de salida con el formato real
+    """
+
+    def __init__(self, completions_client, steps=2):
+        self.client = completions_client
+        self.steps = steps
+        self._files = {}
+        self._batches = {}
+        self.files = SimpleNamespace(create=self._create_file, content=self._file_content)
+        self.batches = SimpleNamespace(create=self._create_batch, retrieve=self._retrieve_batch)
+
+    def _create_file(self, file, purpose):
+        data = file.read() if hasattr(file, 'read') else file
+        if isinstance(data, bytes):
+            data = data.decode('utf-8')
+        file_id = f"file-fake-{len(self._files) + 1}"
+        self._files[file_id] = data
+        return SimpleNamespace(id=file_id, purpose=purpose, bytes=len(data))
+
+    def _file_content(self, file_id):
+        return SimpleNamespace(text=self._files[file_id])
+
+    def _create_batch(self, input_file_id, endpoint, completion_window, metadata=None):
+        batch_id = f"batch-fake-{len(self._batches) + 1}"
+        self._batches[batch_id] = {
+            'input_file_id': input_file_id,
+            'endpoint': endpoint,
+            'polls': 0,
+            'output_file_id': None,
+            'counts': (0, 0),
+        }
+        return self._retrieve_batch(batch_id, poll=False)
+
+    def _run(self, batch):
+        lines = []
+        failed = 0
+        for i, line in enumerate(self._files[batch['input_file_id']].splitlines()):
+            if not line.strip():
+                continue
+            request = json.loads(line)
+            record = {'id': f"batch_req_{i + 1}", 'custom_id': request['custom_id'], 'response': None, 'error': None}
+            try:
+                response = self.client.chat.completions.create(**request['body'])
+                record['response'] = {
+                    'status_code': 200,
+                    'body': {
+                        'model': response.model or request['body'].get('model'),
+                        'choices': [{
+                            'index': 0,
+                            'message': {'role': 'assistant', 'content': response.choices[0].message.content},
+                            'finish_reason': 'stop'
+                        }]
+                    }
+                }
+            except Exception as e:
+                failed += 1
+                record['error'] = {'code': 'server_error', 'message': str(e)}
+            lines.append(json.dumps(record, ensure_ascii=False))
+
+        batch['output_file_id'] = self._create_file("\n".join(lines) + "\n", 'batch_output').id
+        batch['counts'] = (len(lines) - failed, failed)
+
+    def _retrieve_batch(self, batch_id, poll=True):
+        batch = self._batches[batch_id]
+        if poll:
+            batch['polls'] += 1
+        if batch['polls'] >= self.steps and batch['output_file_id'] is None:
+            self._run(batch)
+
+        if batch['output_file_id']:
+            status = 'completed'
+        else:
+            status = 'validating' if batch['polls'] == 0 else 'in_progress'
+
+        completed, failed = batch['counts']
+        return SimpleNamespace(
+            id=batch_id,
+            status=status,
+            output_file_id=batch['output_file_id'],
+            error_file_id=None,
+            request_counts=SimpleNamespace(total=completed + failed, completed=completed, failed=failed)
+        )
+
+
+def focus_line(index, tipo=None, temas=None):
+    """Enfoque de la petición i: reparte los temas en rotación para variar el batch"""
+    parts = []
+    if temas:
+        parts.append(f"tema '{temas[index % len(temas)]}'")
+    if tipo:
+        parts.append(f"tipo {tipo}")
+    return f"ENFOQUE DE ESTA IDEA: {', '.join(parts)}" if parts else ""
+
+
+def write_requests(generator, count, path, tipo=None, temas=None):
+    """JSONL de la Batch API: una petición de chat completion por idea"""
+    trends_context = generator.trends_context()
+    exclusion_digest = generator.idea_tracker.digest.text()
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in range(count):
+            context = "\n".join(part for part in (trends_context, focus_line(i, tipo, temas)) if part)
+            body, _ = generator.idea_generator.build_request(context, exclusion_digest)
+            f.write(json.dumps({
+                'custom_id': f"idea-{i:05d}",
+                'method': 'POST',
+                'url': ENDPOINT,
+                'body': body
+            }, ensure_ascii=False) + '\n')
+    return path
+
+
+def state_path(batch_id):
+    return os.path.join(BATCH_DIR, f"{batch_id}.json")
+
+
+def load_state(batch_id):
+    with open(state_path(batch_id), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def submit(client, requests_path, metadata=None):
+    """Sube el JSONL y crea el batch; guarda el estado para poder reanudar"""
+    with open(requests_path, 'rb') as f:
+        input_file = client.files.create(file=f, purpose='batch')
+    batch = client.batches.create(
+        input_file_id=input_file.id,
+        endpoint=ENDPOINT,
+        completion_window='24h'
+    )
+    state = {
+        'batch_id': batch.id,
+        'input_file_id': input_file.id,
+        'requests_path': requests_path,
+        'created': datetime.now().isoformat(),
+        'status': batch.status,
+        'imported': False,
+        **(metadata or {})
+    }
+    atomic_write_json(state_path(batch.id), state)
+    print(f"📤 Batch {batch.id} enviado ({requests_path})")
+    return state
+
+
+def poll(client, batch_id, interval=None, timeout=None):
+    """Consulta el batch hasta que termina (o hasta timeout segundos)"""
+    interval = float(interval if interval is not None else os.getenv('BATCH_POLL_INTERVAL', 60))
+    deadline = time.monotonic() + timeout if timeout else None
+
+    while True:
+        batch = client.batches.retrieve(batch_id)
+        counts = batch.request_counts
+        print(f"   ⏳ {batch.status}: {counts.completed}/{counts.total} completadas, {counts.failed} fallidas")
+        if batch.status in FINAL_STATUSES:
+            return batch
+        if deadline and time.monotonic() >= deadline:
+            return batch
+        time.sleep(interval)
+
+
+def iter_results(client, output_file_id):
+    """Resultados del batch en orden de custom_id: (custom_id, contenido o None, error)"""
+    records = [
+        json.loads(line)
+        for line in client.files.content(output_file_id).text.splitlines() if line.strip()
+    ]
+    for record in sorted(records, key=lambda r: r['custom_id']):
+        response = record.get('response') or {}
+        if record.get('error') or response.get('status_code') != 200:
+            yield record['custom_id'], None, record.get('error') or f"HTTP {response.get('status_code')}"
+            continue
+        yield record['custom_id'], response['body']['choices'][0]['message']['content'], None
+
+
+def import_results(generator, client, batch):
+    """Filtra los resultados (score y duplicados) y guarda las aceptadas en una escritura"""
+    stamp = datetime.now().strftime('%Y%m%d%H%M%S')
+    outcomes = {}
+    generator.batch_mode = True
+
+    with generator.memory:
+        try:
+            for custom_id, content, error in iter_results(client, batch.output_file_id):
+                if error:
+                    outcome = 'error'
+                    generator.memory.add_error(str(error), f"batch_backfill {custom_id}")
+                else:
+                    try:
+                        idea, outcome = generator._evaluate_candidate(json.loads(content))
+                    except (ValueError, TypeError, AttributeError) as e:
+                        # JSON roto, que no es un objeto o con campos de otro tipo (score "75")
+                        print(f"   ⚠️  Respuesta inválida ({custom_id}): {e}")
+                        idea, outcome = None, 'invalid'
+                    if idea:
+                        # IDs únicos dentro del batch (mismo segundo)
+                        idea['ID'] = f"IDEA-{stamp}-{custom_id.split('-')[-1]}"
+                        # El tracker indexa al momento: dedup también dentro del batch
+                        generator.save_idea(idea)
+                        print(f"   ✅ {idea['Nombre']} (score {idea['Score Total']})")
+
+                generator.memory.record_attempt('batch', 1, outcome)
+                outcomes[outcome] = outcomes.get(outcome, 0) + 1
+        finally:
+            generator.flush_batch()
+            generator.batch_mode = False
+
+    return outcomes
+
+
+def backfill(generator, client, count=None, tipo=None, temas=None, resume=None, interval=None, timeout=None):
+    if resume:
+        state = load_state(resume)
+        if state.get('imported'):
+            print(f"ℹ️ El batch {resume} ya se importó")
+            return state
+    else:
+        stamp = datetime.now().strftime('%Y%m%d%H%M%S')
+        requests_path = write_requests(generator, count, os.path.join(BATCH_DIR, f"backfill-{stamp}.jsonl"), tipo, temas)
+        print(f"📝 {count} peticiones escritas en {requests_path}")
+        state = submit(client, requests_path, {'count': count, 'tipo': tipo, 'temas': temas})
+
+    batch = poll(client, state['batch_id'], interval, timeout)
+    state['status'] = batch.status
+    if batch.status != 'completed' or not batch.output_file_id:
+        atomic_write_json(state_path(state['batch_id']), state)
+        print(f"⏸️ Batch {state['batch_id']} en estado '{batch.status}'; reanudar con --resume {state['batch_id']}")
+        return state
+
+    outcomes = import_results(generator, client, batch)
+    state['imported'] = True
+    state['outcomes'] = outcomes
+    atomic_write_json(state_path(state['batch_id']), state)
+
+    total = sum(outcomes.values())
+    print(f"📦 Backfill: {outcomes.get('accepted', 0)}/{total} ideas aceptadas "
+          f"({', '.join(f'{k} {v}' for k, v in sorted(outcomes.items()) if k != 'accepted') or 'sin rechazos'})")
+    return state
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Backfill de ideas con la Batch API de OpenAI")
+    parser.add_argument('--count', type=int, default=100, help="Número de peticiones del batch")
+    parser.add_argument('--tipo', help="Tipo de producto para todo el batch (SaaS, Extension...)")
+    parser.add_argument('--temas', help="Temas separados por comas, repartidos en rotación")
+    parser.add_argument('--resume', metavar='BATCH_ID', help="Sondear e importar un batch ya enviado")
+    parser.add_argument('--poll', type=float, help="Segundos entre consultas (BATCH_POLL_INTERVAL)")
+    parser.add_argument('--timeout', type=float, help="Dejar de esperar tras N segundos (se reanuda con --resume)")
+    parser.add_argument('--fake', action='store_true', help="Batch API local sobre el cliente de LLM_MODE")
+    args = parser.parse_args()
+
+    from continuous_generator_AI_SMART import ContinuousGeneratorAISmart
+
+    generator = ContinuousGeneratorAISmart()
+    if args.fake:
+        client = FakeBatchClient(generator.client)
+    else:
+        from openai import OpenAI
+        client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+
+    temas = [t.strip() for t in args.temas.split(',') if t.strip()] if args.temas else None
+    backfill(generator, client, args.count, args.tipo, temas, args.resume,
+             interval=0 if args.fake and args.poll is None else args.poll, timeout=args.timeout)
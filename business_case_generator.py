@@ -4,53 +4,20 @@ Generador de Business Case Profesional
 Documento completo con análisis de mercado, previsiones, opinión profesional
 """
 from datetime import datetime
+from collections import OrderedDict
+import os
+import html
 import json
+import hashlib
 
-class BusinessCaseGenerator:
-
-    def generate_business_case(self, idea_data):
-        """Generar documento business case completo"""
-
-        nombre = idea_data.get('Nombre', 'Producto')
-        tipo = idea_data.get('Tipo', 'SaaS')
-        resumen = idea_data.get('Resumen', '')
-        descripcion = idea_data.get('Descripcion', idea_data.get('Descripción', ''))
-        score = idea_data.get('Score Total', 0)
-        publico = idea_data.get('Público Objetivo', idea_data.get('Publico Objetivo', ''))
-        problema = idea_data.get('Problema', '')
-        precio = idea_data.get('Precio Estimado', '')
-        horas = idea_data.get('Horas Desarrollo', 0)
-        complejidad = idea_data.get('Complejidad', 'Media')
-        mvp_features = idea_data.get('MVP Features', '')
-        canales = idea_data.get('Canales', '')
-
-        # Análisis de mercado basado en tipo
-        market_analysis = self._get_market_analysis(tipo, publico)
-
-        # Previsiones financieras
-        financial_forecast = self._calculate_financial_forecast(precio, tipo)
-
-        # Riesgos y oportunidades
-        risks = self._analyze_risks(complejidad, score, tipo)
-
-        # Opinión profesional
-        professional_opinion = self._get_professional_opinion(score, tipo, complejidad, horas)
-
-        # Roadmap de ejecución
-        roadmap = self._create_roadmap(horas, complejidad)
+import forecast_engine
 
-        html = f'''<!DOCTYPE html>
-<html lang="es">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Business Case - {nombre}</title>
-    <style>
-        @page {{ margin: 2cm; }}
+# Hoja de estilos estática (se construye una sola vez al importar el módulo)
+BUSINESS_CASE_CSS = """        @page { margin: 2cm; }
 
-        * {{ margin: 0; padding: 0; box-sizing: border-box; }}
+        * { margin: 0; padding: 0; box-sizing: border-box; }
 
-        body {{
+        body {
             font-family: 'Georgia', 'Times New Roman', serif;
             line-height: 1.8;
             color: #1a1a1a;
@@ -58,177 +25,177 @@ class BusinessCaseGenerator:
             margin: 0 auto;
             padding: 40px 20px;
             background: #fff;
-        }}
+        }
 
         /* Cover Page */
-        .cover {{
+        .cover {
             text-align: center;
             padding: 100px 0;
             border-bottom: 3px solid #667eea;
             margin-bottom: 60px;
-        }}
+        }
 
-        .cover-title {{
+        .cover-title {
             font-size: 48px;
             font-weight: 700;
             color: #667eea;
             margin-bottom: 16px;
-        }}
+        }
 
-        .cover-subtitle {{
+        .cover-subtitle {
             font-size: 24px;
             color: #666;
             margin-bottom: 32px;
-        }}
+        }
 
-        .cover-meta {{
+        .cover-meta {
             font-size: 14px;
             color: #999;
-        }}
+        }
 
         /* Headers */
-        h1 {{
+        h1 {
             font-size: 36px;
             font-weight: 700;
             color: #1a1a1a;
             margin: 48px 0 24px;
             padding-bottom: 12px;
             border-bottom: 2px solid #667eea;
-        }}
+        }
 
-        h2 {{
+        h2 {
             font-size: 28px;
             font-weight: 600;
             color: #333;
             margin: 36px 0 16px;
-        }}
+        }
 
-        h3 {{
+        h3 {
             font-size: 20px;
             font-weight: 600;
             color: #444;
             margin: 24px 0 12px;
-        }}
+        }
 
         /* Paragraphs */
-        p {{
+        p {
             margin-bottom: 16px;
             text-align: justify;
-        }}
+        }
 
         /* Lists */
-        ul, ol {{
+        ul, ol {
             margin: 16px 0 16px 32px;
-        }}
+        }
 
-        li {{
+        li {
             margin-bottom: 8px;
-        }}
+        }
 
         /* Tables */
-        table {{
+        table {
             width: 100%;
             border-collapse: collapse;
             margin: 24px 0;
             font-size: 14px;
-        }}
+        }
 
-        th {{
+        th {
             background: #667eea;
             color: white;
             padding: 12px;
             text-align: left;
             font-weight: 600;
-        }}
+        }
 
-        td {{
+        td {
             padding: 12px;
             border-bottom: 1px solid #e5e7eb;
-        }}
+        }
 
-        tr:nth-child(even) {{
+        tr:nth-child(even) {
             background: #f9fafb;
-        }}
+        }
 
         /* Boxes */
-        .info-box {{
+        .info-box {
             background: #f0f4ff;
             border-left: 4px solid #667eea;
             padding: 20px;
             margin: 24px 0;
             border-radius: 4px;
-        }}
+        }
 
-        .warning-box {{
+        .warning-box {
             background: #fff7ed;
             border-left: 4px solid #f59e0b;
             padding: 20px;
             margin: 24px 0;
             border-radius: 4px;
-        }}
+        }
 
-        .success-box {{
+        .success-box {
             background: #f0fdf4;
             border-left: 4px solid #10b981;
             padding: 20px;
             margin: 24px 0;
             border-radius: 4px;
-        }}
+        }
 
-        .danger-box {{
+        .danger-box {
             background: #fef2f2;
             border-left: 4px solid #ef4444;
             padding: 20px;
             margin: 24px 0;
             border-radius: 4px;
-        }}
+        }
 
-        .box-title {{
+        .box-title {
             font-weight: 700;
             font-size: 16px;
             margin-bottom: 8px;
-        }}
+        }
 
         /* Score badge */
-        .score-badge {{
+        .score-badge {
             display: inline-block;
             padding: 8px 16px;
             border-radius: 24px;
             font-weight: 700;
             font-size: 18px;
-        }}
+        }
 
-        .score-high {{ background: #d1fae5; color: #065f46; }}
-        .score-medium {{ background: #fef3c7; color: #92400e; }}
-        .score-low {{ background: #fee2e2; color: #991b1b; }}
+        .score-high { background: #d1fae5; color: #065f46; }
+        .score-medium { background: #fef3c7; color: #92400e; }
+        .score-low { background: #fee2e2; color: #991b1b; }
 
         /* Charts */
-        .bar-chart {{
+        .bar-chart {
             margin: 24px 0;
-        }}
+        }
 
-        .bar {{
+        .bar {
             display: flex;
             align-items: center;
             margin-bottom: 12px;
-        }}
+        }
 
-        .bar-label {{
+        .bar-label {
             width: 150px;
             font-weight: 600;
             font-size: 14px;
-        }}
+        }
 
-        .bar-fill {{
+        .bar-fill {
             flex: 1;
             background: #e5e7eb;
             height: 32px;
             border-radius: 4px;
             position: relative;
             overflow: hidden;
-        }}
+        }
 
-        .bar-value {{
+        .bar-value {
             position: absolute;
             left: 0;
             top: 0;
@@ -240,14 +207,161 @@ class BusinessCaseGenerator:
             color: white;
             font-weight: 600;
             font-size: 14px;
-        }}
+        }
 
         /* Print styles */
-        @media print {{
-            body {{ padding: 0; }}
-            .no-print {{ display: none; }}
-        }}
-    </style>
+        @media print {
+            body { padding: 0; }
+            .no-print { display: none; }
+        }
+"""
+
+# Datos de mercado por tipo ({publico} se rellena en cada business case)
+MARKET_DATA = {
+    'SaaS': {
+        'market_size': '<p>El mercado global de SaaS alcanzó los $195 billones en 2023 y se proyecta crecer a $232 billones en 2024 (CAGR 15.7%). El segmento de herramientas de productividad representa aproximadamente el 22% de este mercado.</p>',
+        'primary_segment': '{publico} en empresas de 10-500 empleados',
+        'segment_size': '~2.5M empresas potenciales en mercado de habla hispana',
+        'willingness_to_pay': 'Alta ($20-$100/mes según funcionalidades)',
+        'competition': '<p><strong>Nivel de competencia:</strong> Alto pero fragmentado. Existen players grandes (Salesforce, HubSpot) pero también espacio para soluciones especializadas verticales.</p><p><strong>Diferenciación clave:</strong> Enfoque en nicho específico, UX superior, precio competitivo.</p>',
+        'growth_rate': '15-20%'
+    },
+    'Extension': {
+        'market_size': '<p>Las extensiones de navegador son utilizadas por más de 1,500M de usuarios globalmente. El 65% de usuarios de Chrome tienen al menos una extensión instalada.</p>',
+        'primary_segment': '{publico} usuarios activos de navegador web',
+        'segment_size': '~50M usuarios potenciales en mercado objetivo',
+        'willingness_to_pay': 'Media-Baja (freemium con premium $5-$15/mes)',
+        'competition': '<p><strong>Nivel de competencia:</strong> Medio. Chrome Web Store tiene >200k extensiones pero solo el 1% tiene tracción real.</p><p><strong>Diferenciación clave:</strong> Solución de problema específico, marketing efectivo.</p>',
+        'growth_rate': '10-12%'
+    },
+    'MicroSaaS': {
+        'market_size': '<p>El mercado de MicroSaaS (productos con <$100k ARR) está en explosión. Más de 10,000 MicroSaaS rentables operan actualmente con equipos de 1-3 personas.</p>',
+        'primary_segment': '{publico} buscando soluciones especializadas',
+        'segment_size': '~100k usuarios potenciales en nicho específico',
+        'willingness_to_pay': 'Media ($10-$30/mes)',
+        'competition': '<p><strong>Nivel de competencia:</strong> Bajo-Medio en nichos específicos.</p><p><strong>Diferenciación clave:</strong> Extremadamente enfocado en resolver un problema específico muy bien.</p>',
+        'growth_rate': '25-30%'
+    }
+}
+
+# Oportunidades comunes a todas las ideas (HTML precalculado)
+OPPORTUNITIES_HTML = '<ul>' + ''.join(f'<li>{opp}</li>' for opp in [
+    'Mercado en crecimiento con tendencia alcista sostenida',
+    'Bajo costo de entrada permite pivotes rápidos si es necesario',
+    'Posibilidad de monetización múltiple (freemium, premium, enterprise)',
+    'Escalabilidad técnica relativamente sencilla',
+    'Potencial de expansión internacional con mínimos ajustes'
+]) + '</ul>'
+
+
+def _to_int(value, default=0):
+    """Convierte valores del CSV (int, float, '120', '120h', NaN) a entero"""
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        digits = ''.join(filter(str.isdigit, str(value)))
+        return int(digits) if digits else default
+
+
+def _escape(value):
+    """Texto generado por el LLM -> HTML seguro"""
+    return html.escape(str(value))
+
+
+def _row_key(idea_data):
+    """Hash estable de la fila de entrada (clave de memoización)"""
+    raw = json.dumps(idea_data, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+class BusinessCaseGenerator:
+
+    def __init__(self, cache_size=None):
+        # Caché LRU de documentos renderizados (clave: hash de la fila)
+        self.cache_size = int(cache_size if cache_size is not None else os.getenv('BUSINESS_CASE_CACHE_SIZE', 256))
+        self._cache = OrderedDict()
+
+    def generate_batch(self, ideas):
+        """
+        Genera los business cases de muchas ideas (DataFrame o lista de dicts).
+        Las proyecciones financieras de las ideas no cacheadas se calculan
+        de una sola vez con el motor vectorizado.
+        """
+        if hasattr(ideas, 'to_dict'):
+            ideas = ideas.to_dict('records')
+
+        keys = [_row_key(idea) for idea in ideas]
+        missing = [n for n, key in enumerate(keys) if key not in self._cache]
+        projections = {}
+        if missing:
+            result = forecast_engine.forecast(
+                [ideas[n].get('Precio Estimado', '') for n in missing],
+                [ideas[n].get('Tipo', 'SaaS') for n in missing]
+            )
+            projections = {n: forecast_engine.take(result, j) for j, n in enumerate(missing)}
+
+        return [self._cached_render(key, idea, projections.get(n)) for n, (key, idea) in enumerate(zip(keys, ideas))]
+
+    def generate_business_case(self, idea_data):
+        """Generar documento business case completo (memoizado por contenido de la fila)"""
+        return self._cached_render(_row_key(idea_data), idea_data)
+
+    def _cached_render(self, key, idea_data, projection=None):
+        html = self._cache.get(key)
+        if html is not None:
+            self._cache.move_to_end(key)
+            return html
+
+        html = self._render(idea_data, projection)
+        if self.cache_size > 0:
+            self._cache[key] = html
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return html
+
+    def _render(self, idea_data, projection=None):
+        """Renderiza el documento HTML de una idea"""
+
+        # Todos los campos de texto vienen del LLM: se escapan antes de la plantilla
+        nombre = _escape(idea_data.get('Nombre', 'Producto'))
+        tipo = _escape(idea_data.get('Tipo', 'SaaS'))
+        resumen = _escape(idea_data.get('Resumen', ''))
+        descripcion = _escape(idea_data.get('Descripcion', idea_data.get('Descripción', '')))
+        score = _to_int(idea_data.get('Score Total', 0))
+        publico = _escape(idea_data.get('Público Objetivo', idea_data.get('Publico Objetivo', '')))
+        problema = _escape(idea_data.get('Problema', ''))
+        precio_raw = idea_data.get('Precio Estimado', '')
+        precio = _escape(precio_raw)
+        horas = _to_int(idea_data.get('Horas Desarrollo', 0))
+        complejidad = _escape(idea_data.get('Complejidad', 'Media'))
+        mvp_features = _escape(idea_data.get('MVP Features', ''))
+        canales = _escape(idea_data.get('Canales', ''))
+        idea_id = _escape(idea_data.get('ID', 'N/A'))
+        created = _escape(idea_data.get('Created Date', 'N/A'))
+
+        # Análisis de mercado basado en tipo
+        market_analysis = self._get_market_analysis(tipo, publico)
+
+        # Previsiones financieras (el precio se interpreta sin escapar)
+        financial_forecast = self._calculate_financial_forecast(precio_raw, tipo, projection)
+
+        # Riesgos y oportunidades
+        risks = self._analyze_risks(complejidad, score, tipo)
+
+        # Opinión profesional
+        professional_opinion = self._get_professional_opinion(score, tipo, complejidad, horas)
+
+        # Roadmap de ejecución
+        roadmap = self._create_roadmap(horas, complejidad)
+
+        html = f'''<!DOCTYPE html>
+<html lang="es">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Business Case - {nombre}</title>
+    <style>
+{BUSINESS_CASE_CSS}    </style>
 </head>
 <body>
     <!-- Cover Page -->
@@ -437,8 +551,8 @@ class BusinessCaseGenerator:
 
     <h2>8.1 Datos Técnicos</h2>
     <ul>
-        <li><strong>ID de Idea:</strong> {idea_data.get('ID', 'N/A')}</li>
-        <li><strong>Fecha de Generación:</strong> {idea_data.get('Created Date', 'N/A')}</li>
+        <li><strong>ID de Idea:</strong> {idea_id}</li>
+        <li><strong>Fecha de Generación:</strong> {created}</li>
         <li><strong>Score Total:</strong> {score}/100</li>
         <li><strong>Tipo:</strong> {tipo}</li>
     </ul>
@@ -457,77 +571,31 @@ class BusinessCaseGenerator:
     def _get_market_analysis(self, tipo, publico):
         """Análisis de mercado según tipo"""
 
-        market_data = {
-            'SaaS': {
-                'market_size': '<p>El mercado global de SaaS alcanzó los $195 billones en 2023 y se proyecta crecer a $232 billones en 2024 (CAGR 15.7%). El segmento de herramientas de productividad representa aproximadamente el 22% de este mercado.</p>',
-                'primary_segment': f'{publico} en empresas de 10-500 empleados',
-                'segment_size': '~2.5M empresas potenciales en mercado de habla hispana',
-                'willingness_to_pay': 'Alta ($20-$100/mes según funcionalidades)',
-                'competition': '<p><strong>Nivel de competencia:</strong> Alto pero fragmentado. Existen players grandes (Salesforce, HubSpot) pero también espacio para soluciones especializadas verticales.</p><p><strong>Diferenciación clave:</strong> Enfoque en nicho específico, UX superior, precio competitivo.</p>',
-                'growth_rate': '15-20%'
-            },
-            'Extension': {
-                'market_size': '<p>Las extensiones de navegador son utilizadas por más de 1,500M de usuarios globalmente. El 65% de usuarios de Chrome tienen al menos una extensión instalada.</p>',
-                'primary_segment': f'{publico} usuarios activos de navegador web',
-                'segment_size': '~50M usuarios potenciales en mercado objetivo',
-                'willingness_to_pay': 'Media-Baja (freemium con premium $5-$15/mes)',
-                'competition': '<p><strong>Nivel de competencia:</strong> Medio. Chrome Web Store tiene >200k extensiones pero solo el 1% tiene tracción real.</p><p><strong>Diferenciación clave:</strong> Solución de problema específico, marketing efectivo.</p>',
-                'growth_rate': '10-12%'
-            },
-            'MicroSaaS': {
-                'market_size': '<p>El mercado de MicroSaaS (productos con <$100k ARR) está en explosión. Más de 10,000 MicroSaaS rentables operan actualmente con equipos de 1-3 personas.</p>',
-                'primary_segment': f'{publico} buscando soluciones especializadas',
-                'segment_size': '~100k usuarios potenciales en nicho específico',
-                'willingness_to_pay': 'Media ($10-$30/mes)',
-                'competition': '<p><strong>Nivel de competencia:</strong> Bajo-Medio en nichos específicos.</p><p><strong>Diferenciación clave:</strong> Extremadamente enfocado en resolver un problema específico muy bien.</p>',
-                'growth_rate': '25-30%'
-            }
-        }
+        market = dict(MARKET_DATA.get(tipo, MARKET_DATA['SaaS']))
+        market['primary_segment'] = market['primary_segment'].format(publico=publico)
+        return market
+
+    def _calculate_financial_forecast(self, precio, tipo, projection=None):
+        """Calcular proyecciones financieras (motor vectorizado de forecast_engine)"""
 
-        return market_data.get(tipo, market_data['SaaS'])
-
-    def _calculate_financial_forecast(self, precio, tipo):
-        """Calcular proyecciones financieras"""
-
-        # Extraer número del precio
-        try:
-            precio_num = int(''.join(filter(str.isdigit, precio.split('/')[0])))
-        except:
-            precio_num = 29
-
-        # Generar proyección mensual
-        monthly = []
-        users = 0
-        for month in range(1, 13):
-            if month <= 3:
-                new_users = 5 * month  # Primeros meses: crecimiento lento
-            elif month <= 6:
-                new_users = 15 + (month * 3)  # Tracción inicial
-            elif month <= 9:
-                new_users = 40 + (month * 5)  # Crecimiento acelerado
-            else:
-                new_users = 80 + (month * 10)  # Scaling
-
-            users += new_users
-            mrr = users * precio_num
-
-            monthly.append({
-                'month': month,
-                'users': users,
-                'mrr': mrr,
-                'arr': mrr * 12
-            })
+        projection = projection or forecast_engine.forecast_one(precio, tipo)
+
+        # Proyección mensual
+        monthly = [
+            {'month': month, 'users': int(users), 'mrr': round(float(mrr)), 'arr': round(float(mrr) * 12)}
+            for month, users, mrr in zip(range(1, forecast_engine.HORIZON + 1), projection['users'], projection['mrr'])
+        ]
 
         # Costos
-        dev_cost = 5000 if tipo == 'SaaS' else 2000 if tipo == 'Extension' else 3000
+        dev_cost = int(projection['dev_cost'])
         infra_cost = 3000
         marketing_cost = 6000
         support_cost = 2000
-        total_cost = dev_cost + infra_cost + marketing_cost + support_cost
+        total_cost = int(projection['total_cost'])
 
-        # Break-even
-        breakeven_month = 6
-        breakeven_users = total_cost // (precio_num * 12)
+        # Break-even: primer mes en que los ingresos acumulados cubren los costos
+        breakeven_month = int(projection['breakeven_month']) or f"{forecast_engine.HORIZON}+"
+        breakeven_users = int(projection['breakeven_users'])
 
         return {
             'model': 'Suscripción mensual/anual con modelo freemium' if tipo == 'SaaS' else 'One-time purchase con upsells',
@@ -544,25 +612,24 @@ class BusinessCaseGenerator:
 
     def _generate_revenue_table(self, monthly_data):
         """Generar tabla de ingresos"""
-        html = ''
+        rows = []
         cumulative = 0
         for data in monthly_data[:12]:
             cumulative += data['mrr']
-            html += f'''
+            rows.append(f'''
                 <tr>
                     <td>Mes {data['month']}</td>
                     <td>{data['users']}</td>
                     <td>${data['mrr']:,}</td>
                     <td>${cumulative:,}</td>
                 </tr>
-            '''
-        return html
+            ''')
+        return ''.join(rows)
 
     def _analyze_risks(self, complejidad, score, tipo):
         """Analizar riesgos y oportunidades"""
 
         risks = []
-        opportunities = []
 
         # Riesgos según complejidad
         if complejidad == 'Alta':
@@ -581,27 +648,16 @@ class BusinessCaseGenerator:
         risks.append(('Medio', 'Adquisición de Usuarios', 'CAC puede ser mayor al proyectado inicialmente.'))
         risks.append(('Bajo', 'Churn Rate', 'Usuarios pueden cancelar si no ven valor inmediato.'))
 
-        # Oportunidades
-        opportunities.append('Mercado en crecimiento con tendencia alcista sostenida')
-        opportunities.append('Bajo costo de entrada permite pivotes rápidos si es necesario')
-        opportunities.append('Posibilidad de monetización múltiple (freemium, premium, enterprise)')
-        opportunities.append('Escalabilidad técnica relativamente sencilla')
-        opportunities.append('Potencial de expansión internacional con mínimos ajustes')
-
         # Generar HTML
-        risks_html = '<table><thead><tr><th>Nivel</th><th>Riesgo</th><th>Descripción</th></tr></thead><tbody>'
-        for nivel, nombre, desc in risks:
-            risks_html += f'<tr><td><strong>{nivel}</strong></td><td>{nombre}</td><td>{desc}</td></tr>'
-        risks_html += '</tbody></table>'
-
-        opportunities_html = '<ul>'
-        for opp in opportunities:
-            opportunities_html += f'<li>{opp}</li>'
-        opportunities_html += '</ul>'
+        risks_html = ''.join([
+            '<table><thead><tr><th>Nivel</th><th>Riesgo</th><th>Descripción</th></tr></thead><tbody>',
+            *(f'<tr><td><strong>{nivel}</strong></td><td>{nombre}</td><td>{desc}</td></tr>' for nivel, nombre, desc in risks),
+            '</tbody></table>'
+        ])
 
         return {
             'risks_html': risks_html,
-            'opportunities_html': opportunities_html
+            'opportunities_html': OPPORTUNITIES_HTML
         }
 
     def _get_professional_opinion(self, score, tipo, complejidad, horas):
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Business Case Stage - Etapa opcional del pipeline de deploy
+- BUSINESS_CASE_MODE=off (defecto): no se generan business cases
+- eager: se genera al desplegar, sólo para ideas con score >= BUSINESS_CASE_MIN_SCORE
+- lazy: las ideas elegibles se encolan en data/business_case_queue.json y
+  se procesan en lotes (drain) fuera del camino crítico del deploy
+Cada business case se publica en landing-pages/business-case-<ID>.html y
+la landing page de la idea se re-renderiza con el enlace
+"""
+import os
+import json
+
+from business_case_generator import BusinessCaseGenerator
+from file_utils import atomic_write_json
+from github_pages_deployer import LANDING_DIR, business_case_filename, deploy_to_github_pages
+from pages_manifest import get_manifest
+
+QUEUE_PATH = 'data/business_case_queue.json'
+MODES = ('off', 'eager', 'lazy')
+
+
+class BusinessCaseStage:
+    """Genera business cases de forma inmediata (eager) o diferida (lazy)"""
+
+    def __init__(self, mode=None, min_score=None, batch_size=None, queue_path=QUEUE_PATH):
+        self.mode = (mode or os.getenv('BUSINESS_CASE_MODE', 'off')).lower()
+        if self.mode not in MODES:
+            raise ValueError(f"BUSINESS_CASE_MODE desconocido: {self.mode}")
+
+        self.min_score = int(min_score if min_score is not None else os.getenv('BUSINESS_CASE_MIN_SCORE', 75))
+        self.batch_size = int(batch_size if batch_size is not None else os.getenv('BUSINESS_CASE_BATCH', 20))
+        self.queue_path = queue_path
+        self.generator = None
+
+    @property
+    def enabled(self):
+        return self.mode != 'off'
+
+    def is_eligible(self, idea):
+        try:
+            return int(float(idea.get('Score Total', 0))) >= self.min_score
+        except (TypeError, ValueError):
+            return False
+
+    def _generator(self):
+        if self.generator is None:
+            self.generator = BusinessCaseGenerator()
+        return self.generator
+
+    def _load_queue(self):
+        if not os.path.exists(self.queue_path):
+            return []
+        try:
+            with open(self.queue_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return []
+
+    def _save_queue(self, queue):
+        atomic_write_json(self.queue_path, queue)
+
+    def pending(self):
+        return len(self._load_queue())
+
+    def process(self, idea):
+        """
+        Llamar antes de crear la landing page de la idea.
+        eager: genera el business case ya (la landing se crea con el enlace).
+        lazy: lo encola. Devuelve True si el business case ya existe.
+        """
+        if not self.enabled or not self.is_eligible(idea):
+            return False
+
+        if self.mode == 'eager':
+            self._publish([idea])
+            return True
+
+        queue = [item for item in self._load_queue() if item.get('ID') != idea.get('ID')]
+        queue.append(idea)
+        self._save_queue(queue)
+        print(f"   📑 Business case en cola ({len(queue)} pendientes)")
+        return False
+
+    def _publish(self, ideas):
+        """Renderiza en lote y escribe los business cases (sólo si cambian)"""
+        manifest = get_manifest()
+        documents = self._generator().generate_batch(ideas)
+        for idea, html in zip(ideas, documents):
+            manifest.write_if_changed(f"{LANDING_DIR}/{business_case_filename(idea.get('ID', 'unknown'))}", html)
+        manifest.save()
+
+    def drain(self, limit=None):
+        """Procesa un lote de la cola y re-renderiza sus landing pages con el enlace"""
+        queue = self._load_queue()
+        if not queue:
+            return 0
+
+        limit = limit or self.batch_size
+        batch, rest = queue[:limit], queue[limit:]
+
+        print(f"📑 Generando {len(batch)} business cases ({len(rest)} quedan en cola)")
+        self._publish(batch)
+        for idea in batch:
+            deploy_to_github_pages(idea)
+
+        # La cola sólo se recorta cuando el lote está publicado
+        self._save_queue(rest)
+        return len(batch)
+
+    def maybe_drain(self):
+        """En modo continuo: vaciar un lote cuando la cola alcanza el tamaño de lote"""
+        if self.mode == 'lazy' and self.pending() >= self.batch_size:
+            self.drain()
+
+
+if __name__ == '__main__':
+    import sys
+
+    stage = BusinessCaseStage(mode='lazy')
+    if '--drain' in sys.argv:
+        limit = int(sys.argv[sys.argv.index('--limit') + 1]) if '--limit' in sys.argv else None
+        stage.drain(limit)
+    else:
+        print(f"📑 Business cases pendientes: {stage.pending()}")
+        print("Uso: python business_case_stage.py --drain [--limit N]")
@@ -10,28 +10,51 @@ Continuous Idea Generator AI SMART - SISTEMA DEFINITIVO
 - TODO integrado (anti-repetición, landing, deploy, etc.)
 - DEPLOY: GitHub Pages (en lugar de Vercel)
 """
-import pandas as pd
 import time
 import os
 import json
+import atexit
+import heapq
+import threading
 import schedule
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 import random
 from difflib import SequenceMatcher
-from openai import OpenAI
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 load_dotenv()
 
 # Import del nuevo deployer de GitHub Pages
 from github_pages_deployer import deploy_to_github_pages, update_ideas_list
+from similarity_index import TrigramIndex, MinHashLSHIndex
+from embedding_index import EmbeddingIndex
+from exclusion_digest import ExclusionDigest, estimate_tokens
+from prompt_builder import PromptBuilder
+from stream_parser import StreamingIdeaParser
+from idea_store import IdeaStore
+from file_utils import atomic_write_json
+from llm_cache import build_openai_client
+from business_case_stage import BusinessCaseStage
+from deploy_quota import DeployQuota
 
 class SystemMemory:
     """Memoria persistente del sistema - Aprende y mejora"""
 
     def __init__(self):
         self.memory_path = 'data/system_memory.json'
+        # Write-behind: los cambios se marcan como pendientes y se escriben
+        # como mucho una vez cada MEMORY_FLUSH_INTERVAL segundos
+        self.flush_interval = float(os.getenv('MEMORY_FLUSH_INTERVAL', 30))
+        self.dirty = False
+        self._last_flush = 0.0
+        self._batch_depth = 0
+        # Versión: cambia con cada modificación (clave de memoización del prompt)
+        self.version = 0
+        # Tamaño del top de factores de éxito
+        self.top_k = 10
         self.load_memory()
+        atexit.register(self.flush)
 
     def load_memory(self):
         if os.path.exists(self.memory_path):
@@ -57,9 +80,30 @@ class SystemMemory:
             }
 
     def save_memory(self):
-        os.makedirs('data', exist_ok=True)
-        with open(self.memory_path, 'w', encoding='utf-8') as f:
-            json.dump(self.memory, f, ensure_ascii=False, indent=2)
+        """Marca la memoria como modificada (escritura diferida con debounce)"""
+        self.dirty = True
+        self.version += 1
+        if self._batch_depth == 0 and time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """Escribe la memoria a disco (atómico) si hay cambios pendientes"""
+        if not self.dirty:
+            return
+        atomic_write_json(self.memory_path, self.memory, indent=2)
+        self.dirty = False
+        self._last_flush = time.monotonic()
+
+    def __enter__(self):
+        """Agrupa cambios: dentro del bloque no se escribe, al salir un único flush"""
+        self._batch_depth += 1
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._batch_depth -= 1
+        if self._batch_depth == 0:
+            self.flush()
+        return False
 
     def add_learning(self, learning):
         """Añade aprendizaje nuevo"""
@@ -82,8 +126,27 @@ class SystemMemory:
             self.memory['errors'] = self.memory['errors'][-50:]
         self.save_memory()
 
+    def record_attempt(self, variant, attempt, outcome):
+        """
+        Instrumentación de la generación: llamadas y rechazos por número de
+        intento y motivo, separados por variante del prompt ('digest' / 'plain')
+        """
+        stats = self.memory.setdefault('generation_stats', {}).setdefault(variant, {
+            'calls': 0, 'accepted': 0, 'by_attempt': {}, 'reasons': {}
+        })
+        stats['calls'] += 1
+        by_attempt = stats['by_attempt'].setdefault(str(attempt), {'calls': 0, 'rejected': 0})
+        by_attempt['calls'] += 1
+
+        if outcome == 'accepted':
+            stats['accepted'] += 1
+        else:
+            by_attempt['rejected'] += 1
+            stats['reasons'][outcome] = stats['reasons'].get(outcome, 0) + 1
+        self.save_memory()
+
     def update_stats(self, idea):
-        """Actualiza estadísticas globales"""
+        """Actualiza estadísticas globales y patrones (incremental)"""
         stats = self.memory['stats']
         stats['total_ideas'] += 1
 
@@ -96,32 +159,74 @@ class SystemMemory:
             / stats['total_ideas']
         )
 
+        self._update_patterns(idea)
         self.save_memory()
 
+    def has_pattern_accumulators(self):
+        return 'type_stats' in self.memory['patterns']
+
+    def _success_factor(self, idea):
+        return {
+            'tipo': str(idea['Tipo']),
+            'score': int(idea['Score Total']),
+            'nombre': str(idea['Nombre']),
+            'caracteristicas': f"{idea['Público Objetivo']} - {idea['Problema']}"
+        }
+
+    def _update_patterns(self, idea):
+        """Acumuladores por tipo + heap top-K de factores de éxito (O(log K))"""
+        patterns = self.memory['patterns']
+        tipo = idea.get('Tipo', 'SaaS')
+        score = idea.get('Score Total', 0)
+
+        acc = patterns.setdefault('type_stats', {}).setdefault(tipo, {'count': 0, 'sum': 0, 'best': 0})
+        acc['count'] += 1
+        acc['sum'] += score
+        acc['best'] = max(acc['best'], score)
+        patterns['best_scores_by_type'][tipo] = round(acc['sum'] / acc['count'], 1)
+
+        # Min-heap de [score, secuencia, factor]: a igual score gana la más reciente
+        patterns['success_seq'] = patterns.get('success_seq', 0) + 1
+        heap = patterns.setdefault('success_heap', [])
+        entry = [score, patterns['success_seq'], self._success_factor(idea)]
+        if len(heap) < self.top_k:
+            heapq.heappush(heap, entry)
+        elif entry[:2] > heap[0][:2]:
+            heapq.heapreplace(heap, entry)
+        else:
+            return
+
+        patterns['success_factors'] = [e[2] for e in sorted(heap, key=lambda e: e[:2], reverse=True)]
+
     def analyze_patterns(self, df):
-        """Analiza patrones de éxito"""
+        """Recalcula los acumuladores de patrones desde cero (siembra/recuperación)"""
         if df.empty:
             return
 
-        # Mejores scores por tipo
-        for tipo in df['Tipo'].unique():
-            tipo_df = df[df['Tipo'] == tipo]
-            avg = tipo_df['Score Total'].mean()
-            self.memory['patterns']['best_scores_by_type'][tipo] = round(avg, 1)
-
-        # Top ideas para aprender
-        top_ideas = df.nlargest(10, 'Score Total')
-        success_factors = []
-
-        for _, idea in top_ideas.iterrows():
-            success_factors.append({
-                'tipo': idea['Tipo'],
-                'score': idea['Score Total'],
-                'nombre': idea['Nombre'],
-                'caracteristicas': f"{idea['Público Objetivo']} - {idea['Problema']}"
-            })
-
-        self.memory['patterns']['success_factors'] = success_factors
+        patterns = self.memory['patterns']
+
+        # Acumuladores por tipo (count, sum, best)
+        grouped = df.groupby('Tipo')['Score Total'].agg(['count', 'sum', 'max'])
+        patterns['type_stats'] = {
+            str(tipo): {'count': int(row['count']), 'sum': int(row['sum']), 'best': int(row['max'])}
+            for tipo, row in grouped.iterrows()
+        }
+        patterns['best_scores_by_type'] = {
+            tipo: round(acc['sum'] / acc['count'], 1) for tipo, acc in patterns['type_stats'].items()
+        }
+
+        # Top-K: secuencia según fecha de creación (a igual score, más reciente primero)
+        seq = df['Created Date'].rank(method='first').astype(int)
+        top = df.assign(_seq=seq).nlargest(self.top_k, ['Score Total', '_seq'])
+        heap = [
+            [int(idea['Score Total']), int(idea['_seq']), self._success_factor(idea)]
+            for idea in top.to_dict('records')
+        ]
+        heapq.heapify(heap)
+
+        patterns['success_heap'] = heap
+        patterns['success_seq'] = len(df)
+        patterns['success_factors'] = [e[2] for e in sorted(heap, key=lambda e: e[:2], reverse=True)]
         self.save_memory()
 
     def get_insights(self):
@@ -137,6 +242,15 @@ class SystemMemory:
             best_type = max(patterns['best_scores_by_type'].items(), key=lambda x: x[1])
             insights.append(f"Las ideas tipo {best_type[0]} tienen mejor performance (avg {best_type[1]})")
 
+        for variant, gen in self.memory.get('generation_stats', {}).items():
+            if gen['accepted']:
+                first = gen['by_attempt'].get('1', {'calls': 0, 'rejected': 0})
+                rejection = first['rejected'] / first['calls'] if first['calls'] else 0
+                insights.append(
+                    f"Generación ({variant}): {gen['calls'] / gen['accepted']:.2f} llamadas por idea aceptada, "
+                    f"{rejection:.0%} de rechazo en el primer intento"
+                )
+
         if len(self.memory['learnings']) > 0:
             recent_learning = self.memory['learnings'][-1]['learning']
             insights.append(f"Último aprendizaje: {recent_learning}")
@@ -148,6 +262,42 @@ class TrendResearcher:
 
     def __init__(self, openai_client):
         self.client = openai_client
+        self.cache_path = 'data/trends_cache.json'
+        self.ttl = float(os.getenv('TRENDS_CACHE_TTL', 24 * 3600))
+        # Tras un fallo se reintenta mucho antes (un error de red no apaga las tendencias un día)
+        self.retry_ttl = float(os.getenv('TRENDS_RETRY_TTL', 15 * 60))
+        self._cache = None
+
+    def _load_cache(self):
+        if self._cache is None and os.path.exists(self.cache_path):
+            try:
+                with open(self.cache_path, 'r', encoding='utf-8') as f:
+                    self._cache = json.load(f)
+            except (OSError, ValueError):
+                self._cache = None
+        return self._cache
+
+    def get_trends(self):
+        """Tendencias cacheadas en disco: se investigan como mucho una vez por TTL"""
+        cached = self._load_cache()
+        if cached:
+            ttl = self.retry_ttl if cached.get('failed') else self.ttl
+            if time.time() - cached.get('fetched_at', 0) < ttl:
+                return cached['data']
+
+        print("   🔍 Investigando tendencias actuales...")
+        trends_data = self.research_trends()
+
+        failed = not trends_data.get('trends')
+        if failed and cached:
+            # Si la investigación falla, mejor tendencias caducadas que ninguna
+            trends_data = cached['data']
+
+        # Los intentos fallidos también se registran, pero sólo valen retry_ttl
+        self._cache = {'fetched_at': time.time(), 'data': trends_data, 'failed': failed}
+        atomic_write_json(self.cache_path, self._cache, indent=2)
+
+        return trends_data
 
     def research_trends(self):
         """Investiga tendencias actuales (simulado - en producción usar API de noticias)"""
@@ -197,121 +347,92 @@ class SmartIdeaGenerator:
         self.client = openai_client
         self.memory = memory
         self.researcher = TrendResearcher(openai_client)
+        self.prompt_builder = PromptBuilder(memory)
+        # Streaming: la respuesta se valida según llega y se corta si ya es un rechazo
+        self.stream = os.getenv('STREAM_COMPLETIONS', 'false').lower() == 'true'
 
-    def generate_idea_with_reasoning(self, trends_context=""):
-        """Genera idea con razonamiento profundo paso a paso"""
-
-        # Obtener insights de memoria
-        insights = self.memory.get_insights()
-        insights_text = "\\n".join(insights) if insights else "Primera idea"
-
-        # Obtener patrones de éxito
-        success_factors = self.memory.memory['patterns'].get('success_factors', [])
-        success_text = ""
-        if success_factors:
-            top_3 = success_factors[:3]
-            success_text = "Ideas exitosas previas:\\n"
-            for sf in top_3:
-                success_text += f"- {sf['tipo']}: {sf['nombre']} (score {sf['score']})\\n"
-
-        prompt = f"""Eres un experto analista de productos digitales y validación de ideas de negocio.
-
-CONTEXTO DEL SISTEMA:
-{insights_text}
-
-{success_text}
-
-{trends_context}
+    def generate_idea_with_reasoning(self, trends_context="", exclusion_digest="", early_check=None):
+        """
+        Genera idea con razonamiento profundo paso a paso.
+        Con STREAM_COMPLETIONS=true y early_check(campos, nuevos) -> (resultado, motivo) o None,
+        la petición se aborta en cuanto un campo decide el rechazo; entonces
+        devuelve {'idea': campos parciales, 'aborted': resultado, 'reason': motivo}
+        """
 
-TAREA:
-Genera UNA idea de producto digital viable y con potencial comercial.
-
-PROCESO DE RAZONAMIENTO (piensa paso a paso):
-
-1. IDENTIFICACIÓN DEL PROBLEMA
-   - ¿Qué problema real existe?
-   - ¿Quién lo sufre?
-   - ¿Por qué no se ha resuelto bien?
-
-2. ANÁLISIS DE OPORTUNIDAD
-   - ¿Por qué es buen momento AHORA?
-   - ¿Qué hace única esta solución?
-   - ¿Hay mercado suficiente?
-
-3. DEFINICIÓN DEL PRODUCTO
-   - Tipo: SaaS, Extension, MicroSaaS, Plantilla, o InfoProducto
-   - Nombre memorable y claro
-   - Propuesta de valor única
-   - MVP mínimo viable
-
-4. VIABILIDAD TÉCNICA
-   - Complejidad real (Baja/Media/Alta)
-   - Horas estimadas realistas
-   - Stack tecnológico necesario
-
-5. VIABILIDAD COMERCIAL
-   - Público objetivo específico
-   - Canales de adquisición
-   - Precio estimado justificado
-   - Competencia y diferenciación
-
-6. SCORING OBJETIVO
-   - Puntúa del 40 al 90 basado en:
-     * Demanda real del mercado (0-30 pts)
-     * Viabilidad técnica (0-30 pts)
-     * Potencial comercial (0-30 pts)
-
-Devuelve en formato JSON:
-{{
-  "reasoning": {{
-    "problema_identificado": "...",
-    "porque_ahora": "...",
-    "oportunidad": "...",
-    "diferenciacion": "..."
-  }},
-  "idea": {{
-    "nombre": "...",
-    "tipo": "SaaS|Extension|MicroSaaS|Plantilla|InfoProducto",
-    "resumen": "...",
-    "descripcion": "...",
-    "publico_objetivo": "...",
-    "problema": "...",
-    "solucion": "...",
-    "complejidad": "Baja|Media|Alta",
-    "horas_desarrollo": 20-200,
-    "precio_estimado": "$X/mes o $X one-time",
-    "mvp_features": "Feature 1, Feature 2, Feature 3",
-    "canales": "Canal 1, Canal 2, Canal 3",
-    "competencia": "...",
-    "diferenciacion": "...",
-    "score": 40-90
-  }}
-}}
-
-Sé HONESTO en el scoring. No todas las ideas son brillantes.
-"""
+        request, report = self.build_request(trends_context, exclusion_digest)
+        print(f"   {PromptBuilder.format_report(report)}")
 
         try:
-            response = self.client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[{"role": "user", "content": prompt}],
-                response_format={"type": "json_object"},
-                temperature=0.9
-            )
-
-            result = json.loads(response.choices[0].message.content)
-            return result
-
+            return self.request_idea(request, early_check, report=report)
         except Exception as e:
             self.memory.add_error(str(e), "generate_idea_with_reasoning")
             raise
 
+    def request_idea(self, request, early_check=None, stream=None, report=None):
+        """
+        Lanza una petición ya construida (build_request). No toca memoria ni
+        prompt: se puede llamar desde hilos que sobrevivan a la ronda
+        """
+        stream = self.stream if stream is None else stream
+        if stream and early_check is not None:
+            return self._stream_idea(request, early_check)
+
+        response = self.client.chat.completions.create(**request)
+
+        usage = getattr(response, 'usage', None)
+        if report is not None and usage is not None and getattr(usage, 'prompt_tokens', None):
+            print(f"   📏 Prompt real: {usage.prompt_tokens} tokens (estimado ~{report['total']})")
+
+        return json.loads(response.choices[0].message.content)
+
+    def build_request(self, trends_context="", exclusion_digest=""):
+        """Parámetros de la petición de chat completion (también para la Batch API)"""
+        prompt, report = self.prompt_builder.build(trends_context, exclusion_digest)
+        return dict(
+            model="gpt-4o-mini",
+            messages=[{"role": "user", "content": prompt}],
+            response_format={"type": "json_object"},
+            temperature=0.9
+        ), report
+
+    def _stream_idea(self, request, early_check):
+        """Consume el stream alimentando el parser incremental; cierra la conexión al abortar"""
+        stream = self.client.chat.completions.create(**request, stream=True)
+        parser = StreamingIdeaParser()
+
+        try:
+            for chunk in stream:
+                content = chunk.choices[0].delta.content if chunk.choices else None
+                new = parser.feed(content) if content else []
+                rejection = early_check(parser.fields, new)
+                if rejection:
+                    outcome, reason = rejection
+                    return {'idea': dict(parser.fields), 'aborted': outcome, 'reason': reason,
+                            'streamed_tokens': estimate_tokens(parser.text)}
+        finally:
+            close = getattr(stream, 'close', None)
+            if close:
+                close()
+
+        return parser.result()
+
 class IdeaTracker:
-    """Sistema anti-repetición"""
+    """Sistema anti-repetición (índices de similitud + re-scoring exacto)"""
 
     def __init__(self):
         self.file_path = 'data/ideas_history.json'
+        # Ideas nuevas: log append-only (una línea JSON por idea), volcado al
+        # JSON base cada HISTORY_COMPACT_EVERY ideas
+        self.log_path = 'data/ideas_history.jsonl'
+        self.compact_every = int(os.getenv('HISTORY_COMPACT_EVERY', 100))
         self.similarity_threshold = 0.7
+        self.name_threshold = 0.85
+        # Descripciones: 'embedding' (TF-IDF hasheado + coseno) o 'minhash' (LSH + SequenceMatcher)
+        self.dedup_backend = os.getenv('DEDUP_BACKEND', 'embedding').lower()
+        self.embedding_threshold = float(os.getenv('EMBEDDING_SIMILARITY_THRESHOLD', 0.55))
+        # Nombres de candidatos aún en vuelo (streaming): nombre -> dueño
+        self.reserved_names = {}
+        self._reserve_lock = threading.Lock()
         self.load_history()
 
     def load_history(self):
@@ -321,24 +442,118 @@ class IdeaTracker:
         else:
             self.history = {'ideas': [], 'nombres_usados': []}
 
+        # Log: cada línea lleva su posición 'n'; las ya volcadas al JSON base
+        # (compactación interrumpida) se ignoran, y una última línea a medias también
+        self.log_entries = 0
+        if os.path.exists(self.log_path):
+            with open(self.log_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    self.log_entries += 1
+                    if entry.pop('n') >= len(self.history['ideas']):
+                        self.history['ideas'].append(entry)
+                        self.history['nombres_usados'].append(entry['nombre'])
+        self.saved_ideas = len(self.history['ideas'])
+        self.build_indexes()
+
+    def build_indexes(self):
+        """Indexa todo el historial para búsquedas sublineales"""
+        self.names_lower = set()
+        self.name_index = TrigramIndex()
+        self.desc_index = None
+        self.embeddings = None
+
+        for i, nombre in enumerate(self.history['nombres_usados']):
+            self._index_name(i, nombre)
+
+        # Digest de lo "ya cubierto" para el prompt (se actualiza en add_idea)
+        self.digest = ExclusionDigest()
+        self.digest.build(self.history['ideas'])
+
+        descripciones = [idea.get('descripcion', '') for idea in self.history['ideas']]
+        if self.dedup_backend == 'embedding':
+            # Embeddings cacheados en disco: sólo se calculan los que faltan
+            self.embeddings = EmbeddingIndex()
+            self.embeddings.sync(descripciones)
+            self.embeddings.flush()
+        else:
+            self.desc_index = MinHashLSHIndex()
+            for i, descripcion in enumerate(descripciones):
+                self.desc_index.add(i, descripcion)
+
+    def _index_name(self, key, nombre):
+        self.names_lower.add(nombre.lower())
+        self.name_index.add(key, nombre)
+
     def save_history(self):
-        os.makedirs('data', exist_ok=True)
-        with open(self.file_path, 'w', encoding='utf-8') as f:
-            json.dump(self.history, f, ensure_ascii=False, indent=2)
+        """Añade al log las ideas nuevas (O(1) por idea) y compacta periódicamente"""
+        ideas = self.history['ideas']
+        if self.saved_ideas < len(ideas):
+            os.makedirs(os.path.dirname(self.log_path) or '.', exist_ok=True)
+            needs_newline = False
+            if os.path.exists(self.log_path) and os.path.getsize(self.log_path) > 0:
+                # Tras un corte a mitad de línea, empezar en una línea nueva
+                with open(self.log_path, 'rb') as f:
+                    f.seek(-1, os.SEEK_END)
+                    needs_newline = f.read(1) != b'\n'
+            with open(self.log_path, 'a', encoding='utf-8') as f:
+                if needs_newline:
+                    f.write('\n')
+                for n in range(self.saved_ideas, len(ideas)):
+                    f.write(json.dumps({'n': n, **ideas[n]}, ensure_ascii=False, separators=(',', ':')) + '\n')
+            self.log_entries += len(ideas) - self.saved_ideas
+            self.saved_ideas = len(ideas)
+
+            if self.compact_every > 0 and self.log_entries >= self.compact_every:
+                self.compact_history()
+
+        if self.embeddings is not None:
+            self.embeddings.flush()
+
+    def compact_history(self):
+        """Vuelca el historial completo al JSON base (atómico) y vacía el log"""
+        atomic_write_json(self.file_path, self.history)
+        if os.path.exists(self.log_path):
+            os.remove(self.log_path)
+        self.log_entries = 0
 
     def is_duplicate(self, nombre, descripcion):
+        is_dup, reason = self.is_duplicate_name(nombre)
+        if is_dup:
+            return is_dup, reason
+        return self.is_duplicate_concept(descripcion)
+
+    def is_duplicate_name(self, nombre):
         nombre_lower = nombre.lower()
 
-        if nombre_lower in [n.lower() for n in self.history['nombres_usados']]:
+        if nombre_lower in self.names_lower:
             return True, "Nombre duplicado"
 
-        for nombre_previo in self.history['nombres_usados']:
+        # Re-scoring exacto sólo sobre la lista corta del índice
+        nombres = self.history['nombres_usados']
+        for key in self.name_index.candidates(nombre_lower):
+            nombre_previo = nombres[key]
             similarity = SequenceMatcher(None, nombre_lower, nombre_previo.lower()).ratio()
-            if similarity > 0.85:
+            if similarity > self.name_threshold:
                 return True, f"Nombre similar a: {nombre_previo}"
 
+        return False, None
+
+    def is_duplicate_concept(self, descripcion):
+        ideas = self.history['ideas']
+        if self.embeddings is not None:
+            # Un único coseno vectorizado contra todo el historial
+            row, similarity = self.embeddings.most_similar(descripcion)
+            if row is not None and similarity > self.embedding_threshold:
+                return True, f"Concepto similar a: {ideas[row]['nombre']} ({similarity:.2f})"
+            return False, None
+
         desc_lower = descripcion.lower()
-        for idea_previa in self.history['ideas']:
+        for key in self.desc_index.candidates(desc_lower):
+            idea_previa = ideas[key]
             desc_previa = idea_previa.get('descripcion', '').lower()
             similarity = SequenceMatcher(None, desc_lower, desc_previa).ratio()
             if similarity > self.similarity_threshold:
@@ -346,7 +561,7 @@ class IdeaTracker:
 
         return False, None
 
-    def add_idea(self, nombre, descripcion, tipo, score):
+    def add_idea(self, nombre, descripcion, tipo, score, save=True):
         self.history['ideas'].append({
             'nombre': nombre,
             'descripcion': descripcion,
@@ -356,11 +571,27 @@ class IdeaTracker:
         })
         self.history['nombres_usados'].append(nombre)
 
-        if len(self.history['ideas']) > 1000:
-            self.history['ideas'] = self.history['ideas'][-1000:]
-            self.history['nombres_usados'] = self.history['nombres_usados'][-1000:]
+        # Historial completo: los índices mantienen el coste por consulta
+        self._index_name(len(self.history['nombres_usados']) - 1, nombre)
+        self.digest.add(nombre, descripcion)
+        if self.embeddings is not None:
+            self.embeddings.add(descripcion)
+        else:
+            self.desc_index.add(len(self.history['ideas']) - 1, descripcion)
+
+        if save:
+            self.save_history()
+
+    def reserve_name(self, nombre, owner):
+        """Reserva el nombre de un candidato en vuelo. False si otro candidato ya lo tiene"""
+        with self._reserve_lock:
+            holder = self.reserved_names.setdefault(nombre.lower(), owner)
+            return holder is owner
 
-        self.save_history()
+    def release_names(self, owner):
+        with self._reserve_lock:
+            for nombre in [n for n, holder in self.reserved_names.items() if holder is owner]:
+                del self.reserved_names[nombre]
 
 class ContinuousGeneratorAISmart:
     """Sistema completo inteligente"""
@@ -368,16 +599,18 @@ class ContinuousGeneratorAISmart:
     def __init__(self):
         self.csv_path = 'data/ideas-validadas.csv'
         self.min_score = int(os.getenv('MIN_SCORE', 40))
+        self.generation_concurrency = int(os.getenv('GENERATION_CONCURRENCY', 1))
+        self.ideas_per_run = int(os.getenv('IDEAS_PER_RUN', 1))
         self.interval = int(os.getenv('GENERATION_INTERVAL', 900))
         self.auto_deploy = os.getenv('AUTO_DEPLOY', 'false').lower() == 'true'
         self.max_deploys_day = int(os.getenv('MAX_DEPLOYS_DAY', 95))
 
-        # OpenAI
+        # OpenAI (LLM_MODE=replay funciona sin clave ni red)
         openai_key = os.getenv('OPENAI_API_KEY')
-        if not openai_key:
+        if not openai_key and os.getenv('LLM_MODE', 'live').lower() != 'replay':
             raise ValueError("OPENAI_API_KEY no encontrada en .env")
 
-        self.client = OpenAI(api_key=openai_key)
+        self.client = build_openai_client(openai_key)
 
         # Componentes inteligentes
         self.memory = SystemMemory()
@@ -387,129 +620,236 @@ class ContinuousGeneratorAISmart:
         # GitHub Pages deploy (en lugar de Vercel)
         self.use_github_pages = True
 
-        self.deploy_log_path = 'data/deploy_log.json'
+        # Business cases (BUSINESS_CASE_MODE=off|eager|lazy)
+        self.business_cases = BusinessCaseStage()
+
+        # Cupo diario de deploys (seguro con varios generadores en paralelo)
+        self.deploy_quota = DeployQuota(self.max_deploys_day)
         os.makedirs('data', exist_ok=True)
-        self.init_csv()
+        self.store = IdeaStore(self.csv_path)
         self.iteration = 0
-
-    def init_csv(self):
-        if not os.path.exists(self.csv_path):
-            df = pd.DataFrame(columns=[
-                'ID', 'Nombre', 'Tipo', 'Resumen', 'Descripción', 'Público Objetivo',
-                'Problema', 'Solución', 'Complejidad', 'Horas Desarrollo', 'Precio Estimado',
-                'MVP Features', 'Canales', 'Competencia', 'Diferenciación', 'Score Total',
-                'Landing URL', 'Landing Deployed', 'Created Date', 'Reasoning'
-            ])
-            df.to_csv(self.csv_path, index=False, encoding='utf-8-sig')
-
-    def can_deploy_today(self):
-        if not os.path.exists(self.deploy_log_path):
-            return True
-
-        with open(self.deploy_log_path, 'r') as f:
-            log = json.load(f)
-
-        today = datetime.now().date().isoformat()
-        deploys_today = log.get(today, 0)
-        return deploys_today < self.max_deploys_day
-
-    def log_deploy(self):
-        if os.path.exists(self.deploy_log_path):
-            with open(self.deploy_log_path, 'r') as f:
-                log = json.load(f)
-        else:
-            log = {}
-
-        today = datetime.now().date().isoformat()
-        log[today] = log.get(today, 0) + 1
-
-        with open(self.deploy_log_path, 'w') as f:
-            json.dump(log, f)
+        # IDs únicos en la ejecución aunque dos ideas caigan en el mismo segundo
+        self._last_id_stamp = None
+        self._id_seq = 0
+
+        # Sembrar los acumuladores de patrones una sola vez
+        if not self.memory.has_pattern_accumulators():
+            self.memory.analyze_patterns(self.store.read_analytics())
+
+        # Modo batch: CSV, índice y historial se escriben una vez al final
+        self.batch_mode = False
+        self.pending_ideas = []
+        self.pending_list_entries = []
+
+    def trends_context(self):
+        """Tendencias cacheadas (se refrescan como mucho una vez por TTL)"""
+        trends_data = self.idea_generator.researcher.get_trends()
+        if not trends_data.get('trends'):
+            return ""
+        return "TENDENCIAS ACTUALES:\n" + "\n".join(
+            f"- {trend['name']}: {trend['opportunity']}" for trend in trends_data['trends'][:3]
+        )
 
     def generate_idea(self):
         """Genera idea con investigación de tendencias"""
         max_attempts = 5
 
-        # Investigar tendencias cada 10 ideas
-        trends_context = ""
-        if self.iteration % 10 == 0:
-            print("   🔍 Investigando tendencias actuales...")
-            trends_data = self.idea_generator.researcher.research_trends()
-            if trends_data.get('trends'):
-                trends_context = "TENDENCIAS ACTUALES:\\n"
-                for trend in trends_data['trends'][:3]:
-                    trends_context += f"- {trend['name']}: {trend['opportunity']}\\n"
+        trends_context = self.trends_context()
+
+        # Resumen de lo ya cubierto (evita pagar respuestas que serían duplicados)
+        exclusion_digest = self.idea_tracker.digest.text()
+        variant = 'digest' if exclusion_digest else 'plain'
+
+        # El prompt es el mismo para todos los intentos: se construye una vez
+        request, report = self.idea_generator.build_request(trends_context, exclusion_digest)
+        print(f"   {PromptBuilder.format_report(report)}")
+
+        if self.generation_concurrency > 1:
+            return self._generate_idea_concurrent(request, variant, max_attempts)
 
         for attempt in range(max_attempts):
             try:
                 print(f"   💭 Generando idea con razonamiento profundo (intento {attempt+1})...")
 
-                result = self.idea_generator.generate_idea_with_reasoning(trends_context)
+                result = self._request_candidate(request, report=report)
 
-                idea_data = result.get('idea', {})
-                reasoning = result.get('reasoning', {})
+                idea, outcome = self._evaluate_candidate(result)
+                self.memory.record_attempt(variant, attempt + 1, outcome)
+                if idea:
+                    return idea
 
-                nombre = idea_data.get('nombre')
-                descripcion = idea_data.get('descripcion')
-                score = idea_data.get('score', 0)
+            except Exception as e:
+                print(f"   ❌ Error en generación: {e}")
+                self.memory.add_error(str(e), f"generate_idea attempt {attempt+1}")
+                self.memory.record_attempt(variant, attempt + 1, 'error')
 
-                if not nombre or not descripcion:
-                    continue
+        return None
 
-                # Verificar score mínimo
-                if score < self.min_score:
-                    print(f"   ⚠️  Score {score} < {self.min_score}, rechazada")
-                    continue
+    def _generate_idea_concurrent(self, request, variant, max_attempts):
+        """
+        Pide varios candidatos en paralelo y acepta el primero válido.
+        Siempre en streaming: al aceptar uno, las peticiones en curso se cortan
+        en su siguiente chunk en vez de pagarse completas
+        """
+        workers = min(self.generation_concurrency, max_attempts)
+        print(f"   💭 Generando {max_attempts} candidatos en paralelo (concurrencia {workers})...")
+
+        executor = ThreadPoolExecutor(max_workers=workers)
+        cancelled = threading.Event()
+        futures = {
+            executor.submit(self._request_candidate, request, cancelled, True): attempt + 1
+            for attempt in range(max_attempts)
+        }
 
-                # Verificar duplicados
-                is_dup, reason = self.idea_tracker.is_duplicate(nombre, descripcion)
-
-                if not is_dup:
-                    # Formatear idea completa
-                    idea_completa = {
-                        'ID': f"IDEA-{datetime.now().strftime('%Y%m%d%H%M%S')}",
-                        'Nombre': nombre,
-                        'Tipo': idea_data.get('tipo', 'SaaS'),
-                        'Resumen': idea_data.get('resumen', ''),
-                        'Descripción': descripcion,
-                        'Público Objetivo': idea_data.get('publico_objetivo', ''),
-                        'Problema': idea_data.get('problema', ''),
-                        'Solución': idea_data.get('solucion', ''),
-                        'Complejidad': idea_data.get('complejidad', 'Media'),
-                        'Horas Desarrollo': idea_data.get('horas_desarrollo', 80),
-                        'Precio Estimado': idea_data.get('precio_estimado', '$29/mes'),
-                        'MVP Features': idea_data.get('mvp_features', ''),
-                        'Canales': idea_data.get('canales', ''),
-                        'Competencia': idea_data.get('competencia', ''),
-                        'Diferenciación': idea_data.get('diferenciacion', ''),
-                        'Score Total': score,
-                        'Landing URL': '',
-                        'Landing Deployed': 'No',
-                        'Created Date': datetime.now().isoformat(),
-                        'Reasoning': json.dumps(reasoning, ensure_ascii=False)
-                    }
-
-                    return idea_completa
-                else:
-                    print(f"   ⚠️  Idea rechazada: {reason}")
+        try:
+            # Filtrar los candidatos según van llegando
+            for future in as_completed(futures):
+                attempt = futures[future]
+                try:
+                    idea, outcome = self._evaluate_candidate(future.result())
+                except Exception as e:
+                    print(f"   ❌ Error en generación (candidato {attempt}): {e}")
+                    self.memory.add_error(str(e), f"generate_idea attempt {attempt}")
+                    self.memory.record_attempt(variant, attempt, 'error')
+                    continue
 
-            except Exception as e:
-                print(f"   ❌ Error en generación: {e}")
-                self.memory.add_error(str(e), f"generate_idea attempt {attempt+1}")
+                self.memory.record_attempt(variant, attempt, outcome)
+                if idea:
+                    return idea
+        finally:
+            # Cancelar los que no han empezado sin esperar a los que están en curso:
+            # los workers no escriben en memoria ni en el tracker (sólo reservan
+            # nombres, con lock) y se cortan solos en el siguiente chunk
+            cancelled.set()
+            executor.shutdown(wait=False, cancel_futures=True)
 
         return None
 
+    def _request_candidate(self, request, cancelled=None, stream=None, report=None):
+        """
+        Una petición al modelo; en modo streaming, con validación temprana.
+        Los errores y resultados los registra quien llama (hilo principal)
+        """
+        if cancelled is not None and cancelled.is_set():
+            # Ronda ya resuelta: ni llamada
+            return {'idea': {}, 'aborted': 'cancelled', 'reason': "ya se aceptó otro candidato", 'streamed_tokens': 0}
+
+        owner = object()
+        try:
+            return self.idea_generator.request_idea(
+                request, self._early_check(owner, cancelled), stream=stream, report=report
+            )
+        finally:
+            self.idea_tracker.release_names(owner)
+
+    def _early_check(self, owner, cancelled=None):
+        """
+        Comprobación por chunk del modo streaming: score mínimo, nombre
+        (historial y candidatos en vuelo) y concepto, en cuanto cada campo
+        está completo. Devuelve (resultado, motivo) para abortar, o None
+        """
+        def check(fields, new):
+            if cancelled is not None and cancelled.is_set():
+                return 'cancelled', "ya se aceptó otro candidato"
+
+            if 'score' in new and fields['score'] < self.min_score:
+                return 'low_score', f"Score {fields['score']} < {self.min_score}"
+
+            if 'nombre' in new:
+                is_dup, reason = self.idea_tracker.is_duplicate_name(fields['nombre'])
+                if is_dup:
+                    return 'duplicate_name', reason
+                if not self.idea_tracker.reserve_name(fields['nombre'], owner):
+                    return 'duplicate_name', f"Nombre en uso por otro candidato: {fields['nombre']}"
+
+            if 'descripcion' in new:
+                is_dup, reason = self.idea_tracker.is_duplicate_concept(fields['descripcion'])
+                if is_dup:
+                    return 'duplicate_concept', reason
+
+            return None
+
+        return check
+
+    def _evaluate_candidate(self, result):
+        """
+        Valida un candidato (campos, score mínimo, duplicados) y lo formatea.
+        Devuelve (idea o None, resultado): accepted, invalid, low_score,
+        duplicate_name, duplicate_concept o cancelled (streaming)
+        """
+        if result.get('aborted'):
+            print(f"   ✂️  Stream cortado tras ~{result['streamed_tokens']} tokens: {result['reason']}")
+            return None, result['aborted']
+
+        idea_data = result.get('idea', {})
+        reasoning = result.get('reasoning', {})
+
+        nombre = idea_data.get('nombre')
+        descripcion = idea_data.get('descripcion')
+        score = idea_data.get('score', 0)
+
+        if not nombre or not descripcion:
+            return None, 'invalid'
+
+        # Verificar score mínimo
+        if score < self.min_score:
+            print(f"   ⚠️  Score {score} < {self.min_score}, rechazada")
+            return None, 'low_score'
+
+        # Verificar duplicados
+        is_dup, reason = self.idea_tracker.is_duplicate(nombre, descripcion)
+
+        if is_dup:
+            print(f"   ⚠️  Idea rechazada: {reason}")
+            return None, 'duplicate_name' if reason.startswith('Nombre') else 'duplicate_concept'
+
+        # Formatear idea completa
+        return {
+            'ID': self._new_id(),
+            'Nombre': nombre,
+            'Tipo': idea_data.get('tipo', 'SaaS'),
+            'Resumen': idea_data.get('resumen', ''),
+            'Descripción': descripcion,
+            'Público Objetivo': idea_data.get('publico_objetivo', ''),
+            'Problema': idea_data.get('problema', ''),
+            'Solución': idea_data.get('solucion', ''),
+            'Complejidad': idea_data.get('complejidad', 'Media'),
+            'Horas Desarrollo': idea_data.get('horas_desarrollo', 80),
+            'Precio Estimado': idea_data.get('precio_estimado', '$29/mes'),
+            'MVP Features': idea_data.get('mvp_features', ''),
+            'Canales': idea_data.get('canales', ''),
+            'Competencia': idea_data.get('competencia', ''),
+            'Diferenciación': idea_data.get('diferenciacion', ''),
+            'Score Total': score,
+            'Landing URL': '',
+            'Landing Deployed': 'No',
+            'Created Date': datetime.now().isoformat(),
+            'Reasoning': json.dumps(reasoning, ensure_ascii=False)
+        }, 'accepted'
+
+    def _new_id(self):
+        """IDEA-<segundo>; si el segundo se repite en esta ejecución, sufijo -NN"""
+        stamp = datetime.now().strftime('%Y%m%d%H%M%S')
+        if stamp == self._last_id_stamp:
+            self._id_seq += 1
+            return f"IDEA-{stamp}-{self._id_seq:02d}"
+        self._last_id_stamp = stamp
+        self._id_seq = 0
+        return f"IDEA-{stamp}"
+
     def save_idea(self, idea):
-        df_existing = pd.read_csv(self.csv_path, encoding='utf-8-sig')
-        df_new = pd.DataFrame([idea])
-        df_combined = pd.concat([df_new, df_existing], ignore_index=True)
-        df_combined.to_csv(self.csv_path, index=False, encoding='utf-8-sig')
+        if self.batch_mode:
+            self.pending_ideas.append(idea)
+        else:
+            self.store.append(idea)
 
+        # El tracker indexa siempre al momento (dedup dentro del batch)
         self.idea_tracker.add_idea(
             idea['Nombre'],
             idea['Descripción'],
             idea['Tipo'],
-            idea['Score Total']
+            idea['Score Total'],
+            save=not self.batch_mode
         )
 
         self.memory.update_stats(idea)
@@ -520,14 +860,24 @@ class ContinuousGeneratorAISmart:
             return None
 
         try:
+            # Business case antes de la landing (eager) o en cola (lazy)
+            try:
+                self.business_cases.process(idea)
+            except Exception as e:
+                print(f"   ⚠️ Error en business case: {e}")
+                self.memory.add_error(str(e), "business_case")
+
             print("   🚀 Creando landing page...")
             # Usar el nuevo deployer de GitHub Pages
             landing_url, deployed = deploy_to_github_pages(idea)
             
             if deployed:
-                # Actualizar índice de ideas
-                update_ideas_list()
-                self.log_deploy()
+                # Actualizar índice de ideas (inserción incremental)
+                entry = {**idea, 'Landing URL': landing_url}
+                if self.batch_mode:
+                    self.pending_list_entries.append(entry)
+                else:
+                    update_ideas_list([entry])
                 return landing_url
             
         except Exception as e:
@@ -542,11 +892,13 @@ class ContinuousGeneratorAISmart:
             print("\\n🧠 REFLEXIÓN Y AUTO-MEJORA...")
 
             try:
-                df = pd.read_csv(self.csv_path, encoding='utf-8-sig')
+                df = self.store.read_analytics()
 
                 if not df.empty:
-                    # Analizar patrones
-                    self.memory.analyze_patterns(df)
+                    # Los patrones se mantienen al día en update_stats;
+                    # sólo se recalculan si faltan los acumuladores
+                    if not self.memory.has_pattern_accumulators():
+                        self.memory.analyze_patterns(df)
 
                     # Generar learning
                     avg_score = df['Score Total'].mean()
@@ -569,46 +921,98 @@ class ContinuousGeneratorAISmart:
                 print(f"   ⚠️ Error en reflexión: {e}")
 
     def run_iteration(self):
-        self.iteration += 1
-
-        print("\\n" + "="*70)
-        print(f"🚀 Iteración #{self.iteration} - {datetime.now().strftime('%H:%M:%S')}")
-        print("="*70)
-
-        print("💡 Generando idea con IA...")
+        # Una iteración = como mucho una escritura de la memoria
+        with self.memory:
+            self.iteration += 1
+
+            print("\\n" + "="*70)
+            print(f"🚀 Iteración #{self.iteration} - {datetime.now().strftime('%H:%M:%S')}")
+            print("="*70)
+
+            print("💡 Generando idea con IA...")
+
+            idea = self.generate_idea()
+
+            if not idea:
+                print("❌ No se pudo generar idea válida")
+                return
+
+            print(f"✅ Idea generada: {idea['Nombre']} (Score: {idea['Score Total']})")
+            print(f"   Tipo: {idea['Tipo']}")
+            print(f"   Problema: {idea['Problema'][:80]}...")
+
+            if self.auto_deploy and self.use_github_pages:
+                if self.deploy_quota.try_acquire():
+                    print("🎨 Generando landing page...")
+                    url = self.deploy_idea(idea)
+                    if url:
+                        idea['Landing URL'] = url
+                        idea['Landing Deployed'] = 'Sí'
+                        print(f"✅ Landing page creada: {url}")
+                    else:
+                        # El deploy no se completó: devolver el hueco del cupo
+                        self.deploy_quota.release()
+                        print("⚠️  Deploy falló")
+                else:
+                    print(f"⏸️  Límite de deploys alcanzado ({self.max_deploys_day})")
 
-        idea = self.generate_idea()
+            self.save_idea(idea)
+            if self.batch_mode:
+                print("💾 Pendiente de guardar (se escribe al final del batch)")
+            else:
+                print(f"💾 Guardada en CSV")
 
-        if not idea:
-            print("❌ No se pudo generar idea válida")
-            return
+            # Business cases diferidos: un lote cuando la cola se llena
+            if not self.batch_mode:
+                self.drain_business_cases(only_full=True)
 
-        print(f"✅ Idea generada: {idea['Nombre']} (Score: {idea['Score Total']})")
-        print(f"   Tipo: {idea['Tipo']}")
-        print(f"   Problema: {idea['Problema'][:80]}...")
-
-        if self.auto_deploy and self.use_github_pages:
-            if self.can_deploy_today():
-                print("🎨 Generando landing page...")
-                url = self.deploy_idea(idea)
-                if url:
-                    idea['Landing URL'] = url
-                    idea['Landing Deployed'] = 'Sí'
-                    print(f"✅ Landing page creada: {url}")
-                else:
-                    print("⚠️  Deploy falló")
-            else:
-                print(f"⏸️  Límite de deploys alcanzado ({self.max_deploys_day})")
+            # Reflexión periódica
+            self.reflect_and_improve()
 
-        self.save_idea(idea)
-        print(f"💾 Guardada en CSV")
+            print(f"⏳ Siguiente idea en {self.interval//60} minutos...")
 
-        # Reflexión periódica
-        self.reflect_and_improve()
+    def run_batch(self, count):
+        """Genera K ideas en un solo proceso y persiste todo una vez al final"""
+        print(f"📦 Modo batch: {count} ideas en este proceso")
+        self.batch_mode = True
 
-        print(f"⏳ Siguiente idea en {self.interval//60} minutos...")
+        with self.memory:
+            try:
+                for _ in range(count):
+                    self.run_iteration()
+            finally:
+                self.flush_batch()
+                self.batch_mode = False
+
+    def flush_batch(self):
+        """Escribe de una vez las ideas acumuladas en el batch"""
+        if self.pending_ideas:
+            self.store.append_many(self.pending_ideas)
+            self.idea_tracker.save_history()
+            print(f"💾 {len(self.pending_ideas)} ideas guardadas en CSV")
+
+        if self.pending_list_entries:
+            update_ideas_list(self.pending_list_entries)
+
+        self.pending_ideas = []
+        self.pending_list_entries = []
+
+        # Business cases diferidos: un lote por ejecución
+        self.drain_business_cases()
+
+    def drain_business_cases(self, only_full=False):
+        if self.business_cases.mode != 'lazy':
+            return
+        try:
+            if only_full:
+                self.business_cases.maybe_drain()
+            else:
+                self.business_cases.drain()
+        except Exception as e:
+            print(f"⚠️ Error generando business cases: {e}")
+            self.memory.add_error(str(e), "business_case_drain")
 
-    def run(self):
+    def run(self, batch=None):
         print("🚀 IDEA GENERATOR AI SMART - SISTEMA DEFINITIVO")
         print("="*70)
         print("   🧠 OpenAI GPT-4o-mini (~$0.01 por idea)")
@@ -621,15 +1025,22 @@ class ContinuousGeneratorAISmart:
         print("   🌐 GitHub Pages deploy automático")
         print("="*70)
         print(f"   Min score: {self.min_score}")
+        print(f"   Concurrencia generación: {self.generation_concurrency}")
         print(f"   Intervalo: {self.interval}s ({self.interval//60} min)")
         print(f"   Auto-deploy: {'✅' if self.auto_deploy else '❌'}")
+        print(f"   Business cases: {self.business_cases.mode} (score >= {self.business_cases.min_score})")
         print()
+
+        # --batch K: generar K ideas y salir
+        if batch:
+            self.run_batch(batch)
+            return
         
-        # PARA GITHUB ACTIONS: Solo generar UNA idea y salir
+        # PARA GITHUB ACTIONS: generar IDEAS_PER_RUN ideas (por defecto UNA) y salir
         if os.getenv('GITHUB_ACTIONS') == 'true':
-            print("🤖 Modo GitHub Actions: Generando UNA idea...")
-            self.run_iteration()
-            print("\\n✅ Idea generada exitosamente")
+            print(f"🤖 Modo GitHub Actions: Generando {self.ideas_per_run} idea(s)...")
+            self.run_batch(self.ideas_per_run)
+            print("\\n✅ Ideas generadas exitosamente")
             print("⏰ El workflow se ejecutará automáticamente cada 15 min")
             return
         
@@ -655,9 +1066,16 @@ class ContinuousGeneratorAISmart:
                 break
 
 if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Idea Generator AI SMART")
+    parser.add_argument('--batch', type=int, metavar='K',
+                        help="Generar K ideas en un solo proceso y salir")
+    args = parser.parse_args()
+
     try:
         generator = ContinuousGeneratorAISmart()
-        generator.run()
+        generator.run(batch=args.batch)
     except ValueError as e:
         print(f"\\n❌ ERROR: {e}")
         print("\\n💡 Solución: Añade OPENAI_API_KEY a tu .env")
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Deploy Quota - Cupo diario de deploys compartido entre procesos
+- Lectura-modificación-escritura bajo lock de fichero (fcntl / msvcrt)
+  y escritura atómica: varios generadores en la misma máquina no pierden
+  incrementos ni corrompen data/deploy_log.json
+- Contador en memoria: can_deploy() sólo re-parsea el log si el fichero cambió
+- Poda automática de los días más antiguos que DEPLOY_LOG_RETENTION_DAYS
+"""
+import os
+import json
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+from file_utils import atomic_write_json
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+DEPLOY_LOG_PATH = 'data/deploy_log.json'
+
+
+@contextmanager
+def file_lock(lock_path):
+    """Lock exclusivo entre procesos (bloqueante) sobre un fichero auxiliar"""
+    os.makedirs(os.path.dirname(lock_path) or '.', exist_ok=True)
+    with open(lock_path, 'a+') as f:
+        if fcntl:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class DeployQuota:
+    """Cupo de deploys por día: try_acquire() antes de desplegar, release() si falla"""
+
+    def __init__(self, limit=None, path=DEPLOY_LOG_PATH, retention_days=None):
+        self.limit = int(limit if limit is not None else os.getenv('MAX_DEPLOYS_DAY', 95))
+        self.path = path
+        self.lock_path = f"{path}.lock"
+        self.retention_days = int(retention_days if retention_days is not None
+                                  else os.getenv('DEPLOY_LOG_RETENTION_DAYS', 90))
+        # Contador cacheado: (firma del fichero, día, deploys de ese día)
+        self._cached = None
+
+    def _signature(self):
+        try:
+            st = os.stat(self.path)
+            return st.st_mtime_ns, st.st_size
+        except OSError:
+            return None
+
+    def _read(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                log = json.load(f)
+            return log if isinstance(log, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _prune(self, log, today):
+        cutoff = (today - timedelta(days=self.retention_days)).isoformat()
+        return {day: count for day, count in log.items() if day >= cutoff}
+
+    def _remember(self, today, count):
+        self._cached = (self._signature(), today, count)
+
+    def deploys_today(self):
+        """Deploys de hoy (sin lock: el log siempre se escribe de forma atómica)"""
+        today = date.today()
+        signature = self._signature()
+        if self._cached and self._cached[0] == signature and self._cached[1] == today:
+            return self._cached[2]
+
+        count = self._read().get(today.isoformat(), 0)
+        self._cached = (signature, today, count)
+        return count
+
+    def can_deploy(self):
+        """Comprobación rápida (orientativa); la reserva real la hace try_acquire()"""
+        return self.deploys_today() < self.limit
+
+    def remaining(self):
+        return max(self.limit - self.deploys_today(), 0)
+
+    def _update(self, delta):
+        """Lectura-modificación-escritura bajo lock. Devuelve True si se aplicó"""
+        today = date.today()
+        key = today.isoformat()
+
+        with file_lock(self.lock_path):
+            log = self._prune(self._read(), today)
+            count = log.get(key, 0)
+            if delta > 0 and count + delta > self.limit:
+                self._remember(today, count)
+                return False
+
+            log[key] = max(count + delta, 0)
+            atomic_write_json(self.path, log)
+            self._remember(today, log[key])
+            return True
+
+    def try_acquire(self):
+        """Reserva un deploy del cupo de hoy. False si el cupo está agotado"""
+        if not self.can_deploy():
+            return False
+        return self._update(1)
+
+    def release(self):
+        """Devuelve un deploy reservado que no llegó a completarse"""
+        self._update(-1)
+
+
+if __name__ == '__main__':
+    quota = DeployQuota()
+    print(f"🚀 Deploys hoy: {quota.deploys_today()}/{quota.limit} (quedan {quota.remaining()})")
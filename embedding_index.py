@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Embedding Index - Deduplicación semántica offline (sin modelos ni red)
+- HashedTfidfVectorizer: palabras sin acentos ni stopwords, recortadas a
+  raíz de 5 letras, proyectadas con hashing con signo a dimensión fija
+- IDF "en vivo": se recalcula desde los contadores de documentos al consultar
+- EmbeddingIndex: matriz float32 en memoria mapeada (np.memmap) con una fila
+  por idea; la consulta es un único producto matriz-vector (coseno)
+Detecta paráfrasis que SequenceMatcher (comparación carácter a carácter) no ve
+"""
+import os
+import re
+import json
+import zlib
+import numpy as np
+
+from file_utils import atomic_write_json
+from search_index import fold, STOPWORDS
+
+EMBEDDINGS_PATH = 'data/idea_embeddings.f32'
+META_PATH = 'data/idea_embeddings.json'
+
+
+class HashedTfidfVectorizer:
+    """TF (sublineal) hasheado; el IDF se aplica en EmbeddingIndex"""
+
+    def __init__(self, dim=2048, stem_length=5):
+        self.dim = dim
+        # Raíz por prefijo: 'gestionar', 'gestión', 'gestiona' -> 'gesti'
+        self.stem_length = stem_length
+
+    def features(self, text):
+        return [
+            w[:self.stem_length] for w in re.findall(r'[a-z0-9]+', fold(text))
+            if len(w) > 2 and w not in STOPWORDS
+        ]
+
+    def transform(self, text):
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for feature in self.features(text):
+            h = zlib.crc32(feature.encode('utf-8'))
+            vector[h % self.dim] += 1.0 if (h >> 31) & 1 else -1.0
+        # TF sublineal conservando el signo del hashing
+        return np.sign(vector) * np.log1p(np.abs(vector))
+
+
+class EmbeddingIndex:
+    """Matriz de embeddings en disco (memmap) + contadores de documentos para el IDF"""
+
+    def __init__(self, path=EMBEDDINGS_PATH, meta_path=META_PATH, dim=None):
+        self.path = path
+        self.meta_path = meta_path
+        self.dim = int(dim or os.getenv('EMBEDDING_DIM', 2048))
+        self.vectorizer = HashedTfidfVectorizer(self.dim)
+        self.count = 0
+        self.capacity = 0
+        self.matrix = None
+        self.df = np.zeros(self.dim, dtype=np.float64)
+        self.fingerprint = None
+        self._normalized = None
+        self._open()
+
+    def _open(self):
+        meta = {}
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+
+        if meta.get('dim') != self.dim or not os.path.exists(self.path):
+            self.count = 0
+            self._resize(1024, reset=True)
+            return
+
+        self.count = meta['count']
+        self.fingerprint = meta.get('fingerprint')
+        self.capacity = os.path.getsize(self.path) // (4 * self.dim)
+        if self.capacity < self.count:
+            self.count = 0
+            self._resize(1024, reset=True)
+            return
+
+        self.matrix = np.memmap(self.path, dtype=np.float32, mode='r+', shape=(self.capacity, self.dim))
+        self.df = (self.matrix[:self.count] != 0).sum(axis=0).astype(np.float64)
+
+    def _resize(self, capacity, reset=False):
+        """Amplía el fichero (capacidad duplicada) y vuelve a mapearlo"""
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        if self.matrix is not None:
+            self.matrix.flush()
+            del self.matrix
+        with open(self.path, 'wb' if reset else 'r+b') as f:
+            f.truncate(capacity * self.dim * 4)
+        self.capacity = capacity
+        self.matrix = np.memmap(self.path, dtype=np.float32, mode='r+', shape=(capacity, self.dim))
+        if reset:
+            self.df = np.zeros(self.dim, dtype=np.float64)
+
+    def __len__(self):
+        return self.count
+
+    @staticmethod
+    def _text_fingerprint(text):
+        return zlib.crc32(text.encode('utf-8'))
+
+    def sync(self, texts):
+        """
+        Alinea la matriz con la lista de textos (fila i = texts[i]):
+        sólo se calculan los embeddings que faltan; si el historial no
+        coincide con lo indexado, se reconstruye entera
+        """
+        in_sync = self.count <= len(texts) and (
+            self.count == 0 or self.fingerprint == self._text_fingerprint(texts[self.count - 1])
+        )
+        if not in_sync:
+            self.count = 0
+            self.df[:] = 0
+        for text in texts[self.count:]:
+            self.add(text)
+
+    def add(self, text):
+        if self.count >= self.capacity:
+            self._resize(self.capacity * 2)
+        vector = self.vectorizer.transform(text)
+        self.matrix[self.count] = vector
+        self.df += vector != 0
+        self.count += 1
+        self.fingerprint = self._text_fingerprint(text)
+        self._normalized = None
+
+    def idf(self):
+        return np.log((1.0 + self.count) / (1.0 + self.df)) + 1.0
+
+    def _weighted(self):
+        """Filas con IDF aplicado y normalizadas (se recalcula sólo tras añadir)"""
+        if self._normalized is None:
+            idf = self.idf().astype(np.float32)
+            weighted = self.matrix[:self.count] * idf
+            norms = np.linalg.norm(weighted, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            self._normalized = (weighted / norms, idf)
+        return self._normalized
+
+    def similarities(self, text):
+        """Coseno TF-IDF de text contra todas las filas (una operación vectorizada)"""
+        if not self.count:
+            return np.zeros(0, dtype=np.float32)
+
+        weighted, idf = self._weighted()
+        query = self.vectorizer.transform(text) * idf
+        query_norm = np.linalg.norm(query)
+        if not query_norm:
+            return np.zeros(self.count, dtype=np.float32)
+        return weighted @ (query / query_norm)
+
+    def most_similar(self, text):
+        """(fila, similitud) de la idea más parecida, o (None, 0.0)"""
+        sims = self.similarities(text)
+        if not len(sims):
+            return None, 0.0
+        best = int(np.argmax(sims))
+        return best, float(sims[best])
+
+    def flush(self):
+        """Persiste la matriz y el número de filas válidas"""
+        self.matrix.flush()
+        atomic_write_json(self.meta_path, {'dim': self.dim, 'count': self.count, 'fingerprint': self.fingerprint})
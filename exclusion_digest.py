@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Exclusion Digest - Resumen compacto de lo "ya cubierto" para el prompt
+- Temas saturados: pares de palabras más repetidos en las descripciones
+  del historial (p.ej. "redes sociales", "equipos remotos")
+- Nombres usados recientemente
+Se mantiene de forma incremental (cada idea nueva actualiza los contadores)
+y se recorta a un presupuesto estricto de tokens, para que el modelo evite
+duplicados antes de pagar una respuesta completa
+"""
+import os
+import re
+from collections import Counter, defaultdict, deque
+
+from search_index import fold, STOPWORDS
+
+# Palabras genéricas de las descripciones que no definen un tema
+GENERIC_WORDS = {
+    'asi', 'ayuda', 'basada', 'cada', 'como', 'crear', 'disenada', 'eficiente', 'especificas',
+    'facil', 'forma', 'funcionalidades', 'gestionar', 'herramienta', 'incluye', 'integra',
+    'interfaz', 'intuitiva', 'amigable', 'lugar', 'manera', 'mediante', 'necesidades', 'ofrece',
+    'ofrecer', 'permite', 'permitiendo', 'plataforma', 'proporciona', 'real', 'recibir', 'saas',
+    'servicio', 'simple', 'software', 'solo', 'solucion', 'tiempo', 'todo', 'traves', 'usuario',
+    'usuarios', 'utiliza', 'aplicacion', 'ademas', 'este', 'esta'
+}
+
+
+def estimate_tokens(text):
+    """Estimación rápida de tokens (≈ 4 caracteres por token)"""
+    return (len(text) + 3) // 4
+
+
+class ExclusionDigest:
+    """Temas saturados + nombres recientes, con presupuesto de tokens"""
+
+    def __init__(self, max_tokens=None, recent_names=None, max_themes=None, min_theme_count=3):
+        self.max_tokens = int(max_tokens if max_tokens is not None else os.getenv('EXCLUSION_DIGEST_TOKENS', 150))
+        self.max_themes = int(max_themes if max_themes is not None else os.getenv('DIGEST_THEMES', 12))
+        self.min_theme_count = min_theme_count
+        self.recent = deque(maxlen=int(recent_names if recent_names is not None else os.getenv('DIGEST_RECENT_NAMES', 25)))
+        self.theme_counts = Counter()
+        # Forma original más frecuente de cada tema (con acentos)
+        self.theme_forms = defaultdict(Counter)
+        self._text = None
+
+    @property
+    def enabled(self):
+        return self.max_tokens > 0
+
+    def _themes(self, nombre, descripcion):
+        name_words = {fold(w) for w in re.findall(r'\w+', nombre)}
+        words = re.findall(r'\w+', descripcion)
+        themes = {}
+        for a, b in zip(words, words[1:]):
+            fa, fb = fold(a), fold(b)
+            if any(len(w) < 3 or w in STOPWORDS or w in GENERIC_WORDS or w in name_words for w in (fa, fb)):
+                continue
+            # Clave por raíz: "pequeña empresa" y "pequeñas empresas" son el mismo tema
+            themes.setdefault((fa[:5], fb[:5]), f"{a.lower()} {b.lower()}")
+        return themes
+
+    def add(self, nombre, descripcion):
+        """Actualiza el digest con una idea nueva (incremental)"""
+        self.recent.append(nombre)
+        for key, form in self._themes(nombre, descripcion).items():
+            self.theme_counts[key] += 1
+            self.theme_forms[key][form] += 1
+        self._text = None
+
+    def build(self, ideas):
+        for idea in ideas:
+            self.add(idea.get('nombre', ''), idea.get('descripcion', ''))
+
+    def top_themes(self):
+        return [
+            self.theme_forms[key].most_common(1)[0][0]
+            for key, count in self.theme_counts.most_common(self.max_themes)
+            if count >= self.min_theme_count
+        ]
+
+    def text(self):
+        """Bloque para el prompt (memoizado hasta la siguiente idea)"""
+        if self._text is not None:
+            return self._text
+        if not self.enabled or not self.recent:
+            self._text = ""
+            return self._text
+
+        header = "YA CUBIERTO (no repitas estos nombres; en los temas saturados busca un ángulo claramente distinto):"
+        themes = self.top_themes()
+        names = list(reversed(self.recent))
+
+        # Reparto del presupuesto: se añaden temas y nombres alternando
+        # mientras quepan (los más relevantes primero)
+        chosen_themes, chosen_names = [], []
+        merged = []
+        for i in range(max(len(themes), len(names))):
+            if i < len(themes):
+                merged.append(('t', themes[i]))
+            if i < len(names):
+                merged.append(('n', names[i]))
+
+        for kind, item in merged:
+            target = chosen_themes if kind == 't' else chosen_names
+            target.append(item)
+            if estimate_tokens(self._render(header, chosen_themes, chosen_names)) > self.max_tokens:
+                target.pop()
+
+        self._text = self._render(header, chosen_themes, chosen_names)
+        return self._text
+
+    @staticmethod
+    def _render(header, themes, names):
+        lines = [header]
+        if themes:
+            lines.append(f"- Temas: {', '.join(themes)}")
+        if names:
+            lines.append(f"- Nombres: {', '.join(names)}")
+        return "\n".join(lines)
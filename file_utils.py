@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Utilidades de ficheros
+Escrituras atómicas (fichero temporal + rename): un fallo a mitad de
+escritura nunca deja el fichero destino corrupto
+"""
+import os
+import json
+import tempfile
+
+
+def atomic_write_text(path, text, encoding='utf-8'):
+    """Escribe texto de forma atómica"""
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-', suffix=f"-{os.path.basename(path)}")
+    try:
+        with os.fdopen(fd, 'w', encoding=encoding, newline='') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp crea el fichero con 0600: conservar permisos legibles
+        mode = os.stat(path).st_mode & 0o777 if os.path.exists(path) else 0o644
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def atomic_write_json(path, data, indent=None):
+    """Escribe JSON de forma atómica (compacto salvo que se indique indent)"""
+    separators = (',', ':') if indent is None else None
+    text = json.dumps(data, ensure_ascii=False, indent=indent, separators=separators)
+    atomic_write_text(path, text)
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Forecast Engine - Proyecciones financieras vectorizadas (NumPy)
+- Parseo de 'Precio Estimado' para todas las ideas en una pasada
+- Matriz de usuarios / MRR / ARR a 12 meses y mes de break-even
+  como operaciones sobre arrays (sin bucles por idea)
+- Barridos de escenarios (crecimiento x costes) por broadcasting
+"""
+import numpy as np
+import pandas as pd
+
+HORIZON = 12
+DEFAULT_PRICE = 29
+
+# Nuevos usuarios por mes (curva base, igual para todas las ideas)
+_MONTHS = np.arange(1, HORIZON + 1)
+NEW_USERS = np.select(
+    [_MONTHS <= 3, _MONTHS <= 6, _MONTHS <= 9],
+    [5 * _MONTHS, 15 + _MONTHS * 3, 40 + _MONTHS * 5],
+    80 + _MONTHS * 10
+)
+
+# Costes del primer año (desarrollo según tipo)
+DEV_COST = {'SaaS': 5000, 'Extension': 2000}
+DEFAULT_DEV_COST = 3000
+FIXED_COST = 3000 + 6000 + 2000  # infraestructura + marketing + soporte
+
+
+def parse_prices(precios):
+    """
+    Precio numérico de cada idea: primer número del texto, con decimales
+    ('$29/mes' -> 29.0, '$9.99/mes' -> 9.99, '9,99 €' -> 9.99).
+    Sin número o sin texto -> DEFAULT_PRICE. float64: se redondea al mostrar
+    """
+    precios = pd.Series(precios, dtype=object)
+    number = precios.str.extract(r'(\d+(?:[.,]\d+)?)', expand=False).str.replace(',', '.', regex=False)
+    parsed = pd.to_numeric(number, errors='coerce')
+    return parsed.fillna(DEFAULT_PRICE).clip(upper=10 ** 9).to_numpy(dtype=np.float64)
+
+
+def dev_costs(tipos):
+    tipos = pd.Series(tipos, dtype=object)
+    return tipos.map(DEV_COST).fillna(DEFAULT_DEV_COST).to_numpy(dtype=np.int64)
+
+
+def users_curve(growth=1.0):
+    """Usuarios acumulados por mes (growth escala la captación mensual)"""
+    growth = np.asarray(growth, dtype=np.float64)
+    return np.floor(np.cumsum(NEW_USERS * growth[..., None], axis=-1)).astype(np.int64)
+
+
+def breakeven_months(cumulative_revenue, total_cost):
+    """
+    Primer mes (1..HORIZON) en que los ingresos acumulados cubren los costes;
+    0 si no se alcanza en el horizonte. Los ingresos acumulados son crecientes,
+    así que basta contar los meses por debajo del coste.
+    """
+    months_below = (cumulative_revenue < total_cost[..., None]).sum(axis=-1)
+    return np.where(months_below < HORIZON, months_below + 1, 0)
+
+
+def forecast(precios, tipos, growth=1.0, cost_multiplier=1.0):
+    """Proyección de N ideas en un único escenario (arrays de forma (N,) y (N, 12))"""
+    prices = parse_prices(precios)
+    users = users_curve(growth)
+    mrr = prices[:, None] * users[None, :]
+    total_cost = np.floor((dev_costs(tipos) + FIXED_COST) * cost_multiplier).astype(np.int64)
+
+    return {
+        'price': prices,
+        'users': users,
+        'mrr': mrr,
+        'arr': mrr * 12,
+        'dev_cost': dev_costs(tipos),
+        'total_cost': total_cost,
+        'breakeven_month': breakeven_months(np.cumsum(mrr, axis=1), total_cost),
+        'breakeven_users': np.where(prices > 0, total_cost // np.maximum(prices * 12, 1), 0)
+    }
+
+
+def take(result, i):
+    """Proyección de la idea i de un resultado de forecast()"""
+    return {key: value if key == 'users' else value[i] for key, value in result.items()}
+
+
+def forecast_one(precio, tipo):
+    """Proyección de una idea (ruta escalar del business case)"""
+    return take(forecast([precio], [tipo]), 0)
+
+
+def scenario_sweep(df, growths=(0.5, 1.0, 1.5), cost_multipliers=(0.75, 1.0, 1.5)):
+    """
+    Barrido de escenarios sobre todas las ideas del DataFrame.
+    Devuelve un DataFrame largo: una fila por (growth, cost_multiplier, idea)
+    con el ARR del último mes y el mes de break-even (0 = no se alcanza).
+    """
+    growths = np.asarray(growths, dtype=np.float64)
+    cost_multipliers = np.asarray(cost_multipliers, dtype=np.float64)
+
+    prices = parse_prices(df['Precio Estimado'])
+    base_cost = dev_costs(df['Tipo']) + FIXED_COST
+
+    users = users_curve(growths)                                        # (G, M)
+    cumulative = np.cumsum(prices[None, :, None] * users[:, None, :], axis=2)  # (G, N, M)
+    total_cost = np.floor(cost_multipliers[:, None] * base_cost[None, :]).astype(np.int64)  # (C, N)
+    breakeven = breakeven_months(cumulative[:, None], total_cost[None, :])  # (G, C, N)
+    final_arr = prices[None, :] * users[:, -1:] * 12                     # (G, N)
+
+    g, c, n = breakeven.shape
+    return pd.DataFrame({
+        'growth': np.repeat(growths, c * n),
+        'cost_multiplier': np.tile(np.repeat(cost_multipliers, n), g),
+        'ID': np.tile(df['ID'].to_numpy(), g * c),
+        'arr_12': np.repeat(final_arr, c, axis=0).ravel(),
+        'breakeven_month': breakeven.ravel()
+    })
+
+
+def rank_ideas(df, by='arr', top=10, growth=1.0, cost_multiplier=1.0):
+    """Ranking de ideas por ARR proyectado o por break-even más temprano"""
+    result = forecast(df['Precio Estimado'], df['Tipo'], growth, cost_multiplier)
+    ranked = df[['ID', 'Nombre', 'Tipo', 'Precio Estimado']].copy()
+    ranked['arr_12'] = result['arr'][:, -1]
+    ranked['breakeven_month'] = result['breakeven_month']
+
+    if by == 'arr':
+        ranked = ranked.sort_values('arr_12', ascending=False, kind='stable')
+    else:
+        # Las que no alcanzan el break-even en el horizonte van al final
+        never = ranked['breakeven_month'] == 0
+        ranked = ranked.assign(_never=never).sort_values(
+            ['_never', 'breakeven_month', 'arr_12'], ascending=[True, True, False], kind='stable'
+        ).drop(columns='_never')
+    return ranked.head(top) if top else ranked
+
+
+if __name__ == '__main__':
+    import sys
+    import time
+    from idea_store import IdeaStore
+
+    df = IdeaStore().read(['ID', 'Nombre', 'Tipo', 'Precio Estimado'])
+    by = 'breakeven' if '--breakeven' in sys.argv else 'arr'
+
+    start = time.perf_counter()
+    ranked = rank_ideas(df, by=by)
+    elapsed = (time.perf_counter() - start) * 1000
+
+    print(f"📈 Top ideas por {'break-even' if by == 'breakeven' else 'ARR proyectado'} "
+          f"({len(df)} ideas, {elapsed:.1f} ms)")
+    print(ranked.round({'arr_12': 0}).to_string(index=False))
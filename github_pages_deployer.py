@@ -5,149 +5,212 @@ Crea landing pages estáticas y las guarda en carpeta landing-pages/
 """
 import os
 import json
+import re
+import time
+import bisect
+import itertools
+from string import Template
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
 from datetime import datetime
+from pages_manifest import get_manifest, content_digest
+from search_index import write_search_index, append_to_search_index
+import ideas_api
 
-def deploy_to_github_pages(idea_data):
-    """
-    Crea landing page HTML y la guarda en carpeta landing-pages/
-    """
-    try:
-        # Crear carpeta si no existe
-        os.makedirs('landing-pages', exist_ok=True)
-        
-        # Crear nombre de archivo único
-        idea_id = idea_data.get('ID', 'unknown')
-        filename = f"landing-pages/{idea_id}.html"
-        
-        # Sanitizar texto para HTML (escapar caracteres especiales)
-        def clean(text):
-            if not text:
-                return ""
-            text = str(text)
-            text = text.replace('&', '&amp;')
-            text = text.replace('<', '&lt;')
-            text = text.replace('>', '&gt;')
-            text = text.replace('"', '&quot;')
-            text = text.replace("'", '&#39;')
-            return text
-        
-        nombre = clean(idea_data.get('Nombre', 'Idea'))
-        score = idea_data.get('Score Total', 0)
-        tipo = clean(idea_data.get('Tipo', 'Digital'))
-        resumen = clean(idea_data.get('Resumen', ''))
-        descripcion = clean(idea_data.get('Descripción', ''))
-        publico = clean(idea_data.get('Público Objetivo', ''))
-        problema = clean(idea_data.get('Problema', ''))
-        solucion = clean(idea_data.get('Solución', ''))
-        mvp = clean(idea_data.get('MVP Features', ''))
-        complejidad = clean(idea_data.get('Complejidad', 'Media'))
-        horas = clean(idea_data.get('Horas Desarrollo', '80'))
-        precio = clean(idea_data.get('Precio Estimado', '$29/mes'))
-        canales = clean(idea_data.get('Canales', ''))
-        competencia = clean(idea_data.get('Competencia', ''))
-        diferenciacion = clean(idea_data.get('Diferenciación', ''))
-        fecha = clean(idea_data.get('Created Date', datetime.now().strftime('%Y-%m-%d %H:%M')))
-        
-        # Procesar MVP features como lista
-        mvp_items = ''
-        if mvp:
-            features = mvp.split(',')
-            for feature in features:
-                if feature.strip():
-                    mvp_items += f'<li>{clean(feature.strip())}</li>'
-        
-        # Generar HTML limpio
-        html_content = f"""<!DOCTYPE html>
+LANDING_DIR = 'landing-pages'
+STYLESHEET_NAME = 'landing.css'
+
+# Hoja de estilos compartida por todas las landing pages
+LANDING_CSS = """*{margin:0;padding:0;box-sizing:border-box}
+body{font-family:-apple-system,sans-serif;line-height:1.6;color:#1a1a1a;background:linear-gradient(135deg,#667eea 0%,#764ba2 100%);min-height:100vh;padding:40px 20px}
+.container{max-width:900px;margin:0 auto;background:#fff;border-radius:20px;padding:50px;box-shadow:0 20px 60px rgba(0,0,0,0.3)}
+h1{color:#667eea;font-size:3em;margin-bottom:20px}
+.score{background:linear-gradient(135deg,#10b981,#059669);color:#fff;padding:15px 30px;border-radius:50px;display:inline-block;font-size:1.5em;font-weight:700;margin:20px 0}
+.tag{background:#667eea;color:#fff;padding:8px 20px;border-radius:20px;display:inline-block;margin:5px;font-size:0.9em}
+.section{margin:30px 0;padding:25px;background:#f9fafb;border-radius:12px;border-left:4px solid #667eea}
+.section h2{color:#374151;margin-bottom:15px;font-size:1.4em}
+.section p{color:#4b5563;line-height:1.8}
+.info-grid{display:grid;grid-template-columns:repeat(auto-fit,minmax(200px,1fr));gap:15px;margin-top:15px}
+.info-card{background:#fff;padding:15px;border-radius:8px;border:1px solid #e5e7eb}
+.info-card strong{color:#667eea;display:block;margin-bottom:5px}
+ul{margin-left:20px;margin-top:10px}
+li{margin:8px 0;color:#4b5563}
+.footer{text-align:center;margin-top:50px;padding-top:30px;border-top:2px solid #e5e7eb;color:#6b7280}
+.footer a{color:#667eea;text-decoration:none;font-weight:600}
+"""
+
+# Plantilla compilada una vez por proceso
+LANDING_TEMPLATE = Template("""<!DOCTYPE html>
 <html lang="es">
 <head>
 <meta charset="UTF-8">
 <meta name="viewport" content="width=device-width, initial-scale=1.0">
-<title>{nombre} - Idea Validator AI</title>
-<style>
-*{{margin:0;padding:0;box-sizing:border-box}}
-body{{font-family:-apple-system,sans-serif;line-height:1.6;color:#1a1a1a;background:linear-gradient(135deg,#667eea 0%,#764ba2 100%);min-height:100vh;padding:40px 20px}}
-.container{{max-width:900px;margin:0 auto;background:#fff;border-radius:20px;padding:50px;box-shadow:0 20px 60px rgba(0,0,0,0.3)}}
-h1{{color:#667eea;font-size:3em;margin-bottom:20px}}
-.score{{background:linear-gradient(135deg,#10b981,#059669);color:#fff;padding:15px 30px;border-radius:50px;display:inline-block;font-size:1.5em;font-weight:700;margin:20px 0}}
-.tag{{background:#667eea;color:#fff;padding:8px 20px;border-radius:20px;display:inline-block;margin:5px;font-size:0.9em}}
-.section{{margin:30px 0;padding:25px;background:#f9fafb;border-radius:12px;border-left:4px solid #667eea}}
-.section h2{{color:#374151;margin-bottom:15px;font-size:1.4em}}
-.section p{{color:#4b5563;line-height:1.8}}
-.info-grid{{display:grid;grid-template-columns:repeat(auto-fit,minmax(200px,1fr));gap:15px;margin-top:15px}}
-.info-card{{background:#fff;padding:15px;border-radius:8px;border:1px solid #e5e7eb}}
-.info-card strong{{color:#667eea;display:block;margin-bottom:5px}}
-ul{{margin-left:20px;margin-top:10px}}
-li{{margin:8px 0;color:#4b5563}}
-.footer{{text-align:center;margin-top:50px;padding-top:30px;border-top:2px solid #e5e7eb;color:#6b7280}}
-.footer a{{color:#667eea;text-decoration:none;font-weight:600}}
-</style>
+<title>${nombre} - Idea Validator AI</title>
+<link rel="stylesheet" href="landing.css">
 </head>
 <body>
 <div class="container">
-<h1>🚀 {nombre}</h1>
+<h1>🚀 ${nombre}</h1>
 <div>
-<span class="score">📊 Score: {score}/100</span>
-<span class="tag">{tipo}</span>
+<span class="score">📊 Score: ${score}/100</span>
+<span class="tag">${tipo}</span>
 </div>
 <div class="section">
 <h2>📋 Resumen Ejecutivo</h2>
-<p>{resumen}</p>
+<p>${resumen}</p>
 </div>
 <div class="section">
 <h2>📖 Descripción Detallada</h2>
-<p>{descripcion}</p>
+<p>${descripcion}</p>
 </div>
 <div class="section">
 <h2>🎯 Público Objetivo</h2>
-<p>{publico}</p>
+<p>${publico}</p>
 </div>
 <div class="section">
 <h2>❌ Problema que Resuelve</h2>
-<p>{problema}</p>
+<p>${problema}</p>
 </div>
 <div class="section">
 <h2>✅ Solución Propuesta</h2>
-<p>{solucion}</p>
+<p>${solucion}</p>
 </div>
 <div class="section">
 <h2>⚙️ Características MVP</h2>
-<ul>{mvp_items}</ul>
+<ul>${mvp_items}</ul>
 </div>
 <div class="section">
 <h2>📊 Información Técnica y Financiera</h2>
 <div class="info-grid">
-<div class="info-card"><strong>Complejidad</strong>{complejidad}</div>
-<div class="info-card"><strong>Horas de Desarrollo</strong>{horas}</div>
-<div class="info-card"><strong>Precio Estimado</strong>{precio}</div>
+<div class="info-card"><strong>Complejidad</strong>${complejidad}</div>
+<div class="info-card"><strong>Horas de Desarrollo</strong>${horas}</div>
+<div class="info-card"><strong>Precio Estimado</strong>${precio}</div>
 </div>
 </div>
 <div class="section">
 <h2>🎯 Canales de Distribución</h2>
-<p>{canales}</p>
+<p>${canales}</p>
 </div>
 <div class="section">
 <h2>🏆 Análisis Competitivo</h2>
-<p><strong>Competencia:</strong> {competencia}</p>
-<p style="margin-top:15px"><strong>Diferenciación:</strong> {diferenciacion}</p>
+<p><strong>Competencia:</strong> ${competencia}</p>
+<p style="margin-top:15px"><strong>Diferenciación:</strong> ${diferenciacion}</p>
 </div>
-<div class="footer">
+${business_case}<div class="footer">
 <p>✨ Idea generada automáticamente por <strong>Idea Validator AI</strong></p>
 <p>🤖 Powered by OpenAI GPT-4o-mini</p>
-<p>📅 Creada el {fecha}</p>
+<p>📅 Creada el ${fecha}</p>
 <p style="margin-top:15px"><a href="index.html">← Volver al listado de ideas</a></p>
 </div>
 </div>
 </body>
-</html>"""
+</html>""")
+
+# Enlace al business case (sólo si ya existe su página)
+BUSINESS_CASE_LINK = Template("""<div class="section">
+<h2>📑 Business Case</h2>
+<p>Análisis de mercado, proyecciones financieras y plan de ejecución: <a href="${url}">ver business case completo →</a></p>
+</div>
+""")
+
+# Escapado HTML en una sola pasada
+_ESCAPE_TABLE = str.maketrans({
+    '&': '&amp;',
+    '<': '&lt;',
+    '>': '&gt;',
+    '"': '&quot;',
+    "'": '&#39;'
+})
+
+_stylesheet_ready = False
+
+
+def clean(text):
+    """Sanitiza texto para HTML (escapa caracteres especiales)"""
+    if not text:
+        return ""
+    return str(text).translate(_ESCAPE_TABLE)
+
+
+def ensure_stylesheet():
+    """Escribe la hoja de estilos compartida (una vez por proceso)"""
+    global _stylesheet_ready
+    if _stylesheet_ready:
+        return
+
+    get_manifest().write_if_changed(f"{LANDING_DIR}/{STYLESHEET_NAME}", LANDING_CSS)
+    _stylesheet_ready = True
+
+
+def business_case_filename(idea_id):
+    """Nombre del fichero del business case de una idea (relativo a landing-pages/)"""
+    return f"business-case-{idea_id}.html"
+
+
+def render_landing_page(idea_data):
+    """Genera el HTML de la landing page de una idea"""
+    case_file = business_case_filename(idea_data.get('ID', 'unknown'))
+    business_case = ''
+    if os.path.exists(f"{LANDING_DIR}/{case_file}"):
+        business_case = BUSINESS_CASE_LINK.substitute(url=case_file)
+
+    # Procesar MVP features como lista (escapando cada feature una vez)
+    mvp_items = ''.join(
+        f'<li>{clean(feature.strip())}</li>'
+        for feature in str(idea_data.get('MVP Features', '') or '').split(',')
+        if feature.strip()
+    )
+
+    return LANDING_TEMPLATE.substitute(
+        nombre=clean(idea_data.get('Nombre', 'Idea')),
+        score=idea_data.get('Score Total', 0),
+        tipo=clean(idea_data.get('Tipo', 'Digital')),
+        resumen=clean(idea_data.get('Resumen', '')),
+        descripcion=clean(idea_data.get('Descripción', '')),
+        publico=clean(idea_data.get('Público Objetivo', '')),
+        problema=clean(idea_data.get('Problema', '')),
+        solucion=clean(idea_data.get('Solución', '')),
+        mvp_items=mvp_items,
+        complejidad=clean(idea_data.get('Complejidad', 'Media')),
+        horas=clean(idea_data.get('Horas Desarrollo', '80')),
+        precio=clean(idea_data.get('Precio Estimado', '$29/mes')),
+        canales=clean(idea_data.get('Canales', '')),
+        competencia=clean(idea_data.get('Competencia', '')),
+        diferenciacion=clean(idea_data.get('Diferenciación', '')),
+        business_case=business_case,
+        fecha=clean(idea_data.get('Created Date', datetime.now().strftime('%Y-%m-%d %H:%M')))
+    )
+
+
+def deploy_to_github_pages(idea_data):
+    """
+    Crea landing page HTML y la guarda en carpeta landing-pages/
+    """
+    try:
+        # Crear carpeta si no existe
+        os.makedirs(LANDING_DIR, exist_ok=True)
+        ensure_stylesheet()
+        
+        # Crear nombre de archivo único
+        idea_id = idea_data.get('ID', 'unknown')
+        filename = f"{LANDING_DIR}/{idea_id}.html"
+        
+        html_content = render_landing_page(idea_data)
         
-        # Guardar archivo HTML
-        with open(filename, 'w', encoding='utf-8', newline='') as f:
-            f.write(html_content)
+        # Guardar archivo HTML (se omite si el contenido es idéntico)
+        manifest = get_manifest()
+        written = manifest.write_if_changed(filename, html_content)
         
         # URL relativa para GitHub Pages
         landing_url = f"{idea_id}.html"
         
-        print(f"✅ Landing page creada: {filename}")
+        # Ficha JSON de la idea y sus listados por rango (api/)
+        ideas_api.write_idea({**idea_data, 'Landing URL': landing_url, 'Landing Deployed': 'Sí'}, manifest)
+        manifest.save()
+        
+        if written:
+            print(f"✅ Landing page creada: {filename}")
+        else:
+            print(f"✅ Landing page sin cambios: {filename}")
         return landing_url, True
         
     except Exception as e:
@@ -157,47 +220,335 @@ li{{margin:8px 0;color:#4b5563}}
         return "", False
 
 
-def update_ideas_list():
+def _render_job(row):
+    """Tarea del pool: renderiza una fila y devuelve (ruta, html, hash)"""
+    html_content = render_landing_page(row)
+    return f"{LANDING_DIR}/{row['ID']}.html", html_content, content_digest(html_content)
+
+
+def _render_chunk(rows):
+    """Tarea del pool: un lote de filas (amortiza el coste de IPC por tarea)"""
+    return [_render_job(row) for row in rows]
+
+
+def rebuild_landing_pages(csv_path='data/ideas-validadas.csv', workers=None):
+    """
+    Re-renderiza todas las landing pages desde el store en paralelo.
+    Sólo reescribe las páginas cuyo contenido ha cambiado.
+    """
+    from idea_store import IdeaStore
+
+    os.makedirs(LANDING_DIR, exist_ok=True)
+    ensure_stylesheet()
+
+    # Sólo ideas con landing page en GitHub Pages (no URLs antiguas de Vercel)
+    rows = (
+        row for row in IdeaStore(csv_path).iter_rows()
+        if row.get('Landing URL') == f"{row['ID']}.html"
+    )
+
+    manifest = get_manifest()
+    start = time.perf_counter()
+    rendered = written = 0
+
+    workers = workers or os.cpu_count() or 1
+    chunk_size = int(os.getenv('RENDER_CHUNK_SIZE', 64))
+    # executor.map consumiría todo el generador antes de devolver nada: se
+    # envían lotes en una ventana acotada y se lee más CSV según se liberan
+    max_in_flight = 2 * workers
+    chunks = iter(lambda: list(itertools.islice(rows, chunk_size)), [])
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = set()
+        while True:
+            for chunk in itertools.islice(chunks, max_in_flight - len(pending)):
+                pending.add(executor.submit(_render_chunk, chunk))
+            if not pending:
+                break
+
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                for path, html_content, digest in future.result():
+                    rendered += 1
+                    if manifest.write_if_changed(path, html_content, digest):
+                        written += 1
+
+    manifest.save()
+
+    elapsed = time.perf_counter() - start
+    rate = rendered / elapsed if elapsed > 0 else 0
+    print(f"✅ Landing pages: {rendered} renderizadas, {written} reescritas, "
+          f"{rendered - written} sin cambios ({elapsed:.2f}s, {rate:.0f} páginas/s)")
+    return rendered, written
+
+
+IDEAS_LIST_PATH = 'landing-pages/ideas-list.json'
+INDEX_DIR = 'landing-pages/index'
+
+
+def _ideas_list_entry(idea):
+    """Entrada resumida de una idea para ideas-list.json"""
+    return {
+        'id': str(idea.get('ID', '')),
+        'nombre': str(idea.get('Nombre', '')),
+        'tipo': str(idea.get('Tipo', '')),
+        'resumen': str(idea.get('Resumen', ''))[:150] + '...',
+        'score': int(idea.get('Score Total', 0)),
+        'landing_url': str(idea.get('Landing URL', '')),
+        'fecha': str(idea.get('Created Date', ''))
+    }
+
+
+def _build_ideas_list(csv_path):
+    """Reconstruye la lista completa desde el CSV (ordenada por score)"""
+    from idea_store import IdeaStore
+
+    # Leer CSV (vista newest-first del store)
+    df = IdeaStore(csv_path).read()
+
+    ideas_list = [_ideas_list_entry(row) for row in df.to_dict('records')]
+
+    # Ordenar por score descendente (estable: a igual score, más recientes primero)
+    ideas_list.sort(key=lambda x: x['score'], reverse=True)
+    return ideas_list
+
+
+def _load_ideas_list():
+    if not os.path.exists(IDEAS_LIST_PATH):
+        return None
+    try:
+        with open(IDEAS_LIST_PATH, 'r', encoding='utf-8') as f:
+            ideas_list = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    # Listas antiguas sin fecha: forzar reconstrucción completa
+    if ideas_list and 'fecha' not in ideas_list[0]:
+        return None
+    return ideas_list
+
+
+def _type_slug(tipo):
+    return re.sub(r'[^a-z0-9]+', '-', tipo.lower()).strip('-') or 'otros'
+
+
+def _write_pages(manifest, name, entries, page_size, first_page=0):
     """
-    Lee todas las ideas del CSV y genera el archivo ideas-list.json
-    para el índice de GitHub Pages
+    Parte una vista en páginas de page_size entradas. Devuelve el nº de páginas.
+    Con first_page, entries empieza en esa página y las anteriores no se tocan
     """
+    pages = first_page
+    for start in range(0, len(entries), page_size):
+        manifest.write_if_changed(
+            f"{INDEX_DIR}/{name}-{pages}.json",
+            json.dumps(entries[start:start + page_size], ensure_ascii=False, separators=(',', ':'))
+        )
+        pages += 1
+    return pages
+
+
+def _load_json(path):
     try:
-        import pandas as pd
-        
-        csv_path = 'data/ideas-validadas.csv'
-        
-        if not os.path.exists(csv_path):
-            print("⚠️  CSV no encontrado")
-            return
-        
-        # Leer CSV
-        df = pd.read_csv(csv_path, encoding='utf-8-sig')
-        
-        # Convertir a lista de diccionarios
-        ideas_list = []
-        
-        for _, row in df.iterrows():
-            idea = {
-                'id': str(row.get('ID', '')),
-                'nombre': str(row.get('Nombre', '')),
-                'tipo': str(row.get('Tipo', '')),
-                'resumen': str(row.get('Resumen', ''))[:150] + '...',
-                'score': int(row.get('Score Total', 0)),
-                'landing_url': str(row.get('Landing URL', ''))
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _insert_into_view(manifest, name, view_tail, first_page, new_entries, page_size):
+    """Inserta (bisect) en la cola de una vista y reescribe desde first_page"""
+    for entry in new_entries:
+        bisect.insort(view_tail, entry, key=lambda x: x['fecha'])
+    return _write_pages(manifest, name, view_tail, page_size, first_page)
+
+
+def _append_to_date_view(manifest, name, count_before, new_entries, page_size):
+    """
+    Vista por fecha sin reordenar todo: las ideas nuevas se insertan con bisect
+    en la última página publicada, y sólo se reescribe desde ella.
+    Devuelve (nº de páginas, True si todas quedan al final de la vista),
+    o (None, False) si alguna cae antes de la última página
+    """
+    new_entries = sorted(new_entries, key=lambda x: x['fecha'])
+    if not count_before:
+        return _write_pages(manifest, name, new_entries, page_size), True
+
+    last = (count_before - 1) // page_size
+    tail = _load_json(f"{INDEX_DIR}/{name}-{last}.json")
+    if not tail or len(tail) != count_before - last * page_size:
+        return None, False
+    if new_entries[0]['fecha'] < tail[0]['fecha']:
+        return None, False
+    appended = new_entries[0]['fecha'] >= tail[-1]['fecha']
+    return _insert_into_view(manifest, name, tail, last, new_entries, page_size), appended
+
+
+def _update_sharded_index(ideas_list, new_entries, manifest, page_size):
+    """
+    Actualización incremental del índice paginado: sólo las vistas de las
+    ideas nuevas, y en cada una sólo las páginas desde su punto de inserción.
+    Devuelve False si el índice publicado no cuadra (hay que reconstruirlo)
+    """
+    index_manifest = _load_json(f"{INDEX_DIR}/manifest.json")
+    total = len(ideas_list)
+    if (not index_manifest or index_manifest.get('page_size') != page_size
+            or index_manifest.get('total') != total - len(new_entries)):
+        return False
+
+    new_ids = {e['id'] for e in new_entries}
+    positions = [pos for pos, i in enumerate(ideas_list) if i['id'] in new_ids]
+    if len(positions) != len(new_ids):
+        return False
+
+    # Vista 'score' (ascendente = ideas_list al revés): desde la primera posición insertada
+    first_page = (total - 1 - positions[-1]) // page_size
+    pages_score = _write_pages(manifest, 'score', ideas_list[:total - first_page * page_size][::-1],
+                               page_size, first_page)
+
+    # Vista 'date': inserción en la última página
+    pages_date, appended = _append_to_date_view(manifest, 'date', total - len(new_entries), new_entries, page_size)
+    if pages_date is None:
+        return False
+
+    # Búsqueda: si las nuevas van al final de 'date' ningún doc cambia de número
+    search = None
+    if appended:
+        search = append_to_search_index(total - len(new_entries), sorted(new_entries, key=lambda x: x['fecha']),
+                                        index_manifest.get('search', []), manifest)
+    if search is None:
+        search = write_search_index(sorted(ideas_list, key=lambda x: x['fecha']), manifest)
+
+    types = index_manifest['types']
+    for tipo in sorted({e['tipo'] for e in new_entries}):
+        added = [e for e in new_entries if e['tipo'] == tipo]
+        slug = _type_slug(tipo)
+        info = types.get(tipo, {'slug': slug, 'count': 0, 'pages': {'score': 0, 'date': 0}})
+
+        of_type = [i for i in ideas_list if i['tipo'] == tipo]
+        added_ids = {e['id'] for e in added}
+        last_pos = max(pos for pos, i in enumerate(of_type) if i['id'] in added_ids)
+        first_page = (len(of_type) - 1 - last_pos) // page_size
+        pages_type_score = _write_pages(manifest, f"type-{slug}-score",
+                                        of_type[:len(of_type) - first_page * page_size][::-1],
+                                        page_size, first_page)
+        pages_type_date, _ = _append_to_date_view(manifest, f"type-{slug}-date", info['count'], added, page_size)
+        if pages_type_date is None:
+            return False
+
+        types[tipo] = {
+            'slug': slug,
+            'count': info['count'] + len(added),
+            'pages': {'score': pages_type_score, 'date': pages_type_date}
+        }
+
+    index_manifest.update({
+        'total': total,
+        'avg_score': round(sum(i['score'] for i in ideas_list) / total),
+        'best_score': ideas_list[0]['score'],
+        'pages': {'score': pages_score, 'date': pages_date},
+        'types': dict(sorted(types.items())),
+        'search': search
+    })
+    manifest.write_if_changed(
+        f"{INDEX_DIR}/manifest.json",
+        json.dumps(index_manifest, ensure_ascii=False, separators=(',', ':'))
+    )
+    return True
+
+
+def write_sharded_index(ideas_list, manifest=None, new_entries=None):
+    """
+    Índice paginado para landing-pages/index.html:
+    - Vistas 'score' y 'date' (y por tipo) en orden ascendente, en páginas de N.
+      El cliente lee de la última página hacia atrás para el orden descendente.
+    - Con new_entries (ya insertadas en ideas_list), sólo se reescriben las
+      páginas desde su posición en las vistas a las que pertenecen.
+    - manifest.json pequeño con totales y número de páginas de cada vista.
+    - Índice de búsqueda en landing-pages/search/ (doc n = posición n en 'date').
+    """
+    manifest = manifest or get_manifest()
+    page_size = int(os.getenv('INDEX_PAGE_SIZE', 50))
+
+    if new_entries and _update_sharded_index(ideas_list, new_entries, manifest, page_size):
+        return
+
+    # ideas_list está en score descendente (a igual score, más recientes primero)
+    by_score = ideas_list[::-1]
+    by_date = sorted(ideas_list, key=lambda x: x['fecha'])
+
+    total = len(ideas_list)
+    index_manifest = {
+        'total': total,
+        'avg_score': round(sum(i['score'] for i in ideas_list) / total) if total else 0,
+        'best_score': ideas_list[0]['score'] if total else 0,
+        'page_size': page_size,
+        'pages': {
+            'score': _write_pages(manifest, 'score', by_score, page_size),
+            'date': _write_pages(manifest, 'date', by_date, page_size)
+        },
+        'types': {},
+        'search': write_search_index(by_date, manifest)
+    }
+
+    for tipo in sorted({i['tipo'] for i in ideas_list}):
+        slug = _type_slug(tipo)
+        index_manifest['types'][tipo] = {
+            'slug': slug,
+            'count': sum(1 for i in ideas_list if i['tipo'] == tipo),
+            'pages': {
+                'score': _write_pages(manifest, f"type-{slug}-score", [i for i in by_score if i['tipo'] == tipo], page_size),
+                'date': _write_pages(manifest, f"type-{slug}-date", [i for i in by_date if i['tipo'] == tipo], page_size)
             }
-            ideas_list.append(idea)
-        
-        # Ordenar por score descendente
-        ideas_list.sort(key=lambda x: x['score'], reverse=True)
-        
-        # Guardar JSON
-        json_path = 'landing-pages/ideas-list.json'
-        with open(json_path, 'w', encoding='utf-8') as f:
-            json.dump(ideas_list, f, ensure_ascii=False, indent=2)
-        
+        }
+
+    manifest.write_if_changed(
+        f"{INDEX_DIR}/manifest.json",
+        json.dumps(index_manifest, ensure_ascii=False, separators=(',', ':'))
+    )
+
+
+def update_ideas_list(new_ideas=None):
+    """
+    Actualiza landing-pages/ideas-list.json y el índice paginado de GitHub Pages.
+    - Sin argumentos: reconstrucción completa desde el CSV
+    - Con new_ideas: inserción incremental (búsqueda binaria por score)
+    """
+    try:
+        csv_path = 'data/ideas-validadas.csv'
+
+        ideas_list = None
+        if new_ideas is not None:
+            ideas_list = _load_ideas_list()
+
+        # Índice incremental sólo si se parte de la lista publicada
+        new_entries = None
+        if ideas_list is not None and new_ideas:
+            new_entries = [_ideas_list_entry(idea) for idea in new_ideas]
+
+        if ideas_list is None:
+            if not os.path.exists(csv_path):
+                print("⚠️  CSV no encontrado")
+                return
+            ideas_list = _build_ideas_list(csv_path)
+
+        for idea in new_ideas or []:
+            entry = _ideas_list_entry(idea)
+            ideas_list = [i for i in ideas_list if i['id'] != entry['id']]
+            # Antes de las de igual score: las más recientes van primero
+            pos = bisect.bisect_left(ideas_list, -entry['score'], key=lambda x: -x['score'])
+            ideas_list.insert(pos, entry)
+
+        # Guardar JSON compacto de forma atómica (si ha cambiado)
+        manifest = get_manifest()
+        manifest.write_if_changed(
+            IDEAS_LIST_PATH,
+            json.dumps(ideas_list, ensure_ascii=False, separators=(',', ':'))
+        )
+        write_sharded_index(ideas_list, manifest, new_entries)
+        manifest.save()
+
         print(f"✅ Lista de ideas actualizada: {len(ideas_list)} ideas")
-        
+
     except Exception as e:
         print(f"❌ Error actualizando lista de ideas: {str(e)}")
         import traceback
@@ -205,6 +556,27 @@ def update_ideas_list():
 
 
 if __name__ == '__main__':
+    import sys
+
+    # Reconstrucción completa del índice (recuperación)
+    if '--rebuild-index' in sys.argv:
+        update_ideas_list()
+        sys.exit(0)
+
+    # Ficheros publicados que han cambiado desde la última consulta (para git add)
+    if '--changed' in sys.argv:
+        for path in get_manifest().pop_changed():
+            print(path)
+        sys.exit(0)
+
+    # Re-render masivo de landing pages (tras cambios de plantilla)
+    if '--rebuild-pages' in sys.argv:
+        workers = None
+        if '--workers' in sys.argv:
+            workers = int(sys.argv[sys.argv.index('--workers') + 1])
+        rebuild_landing_pages(workers=workers)
+        sys.exit(0)
+
     # Test
     test_idea = {
         'ID': 'test-001',
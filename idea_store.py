@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Idea Store - Almacén de ideas append-only
+- Inserciones O(1): cada idea se añade al final del CSV
+- Vista de lectura ordenada (más recientes primero)
+- Compactación periódica: reescribe el CSV en orden cronológico inverso
+- Snapshot analítico: CSV ligero sólo con columnas numéricas/categóricas,
+  actualizado de forma incremental en cada inserción
+El CSV sigue siendo el formato de intercambio (metrics_tracker, update_ideas_list)
+"""
+import os
+import csv
+import json
+import pandas as pd
+
+from file_utils import atomic_write_json
+
+COLUMNS = [
+    'ID', 'Nombre', 'Tipo', 'Resumen', 'Descripción', 'Público Objetivo',
+    'Problema', 'Solución', 'Complejidad', 'Horas Desarrollo', 'Precio Estimado',
+    'MVP Features', 'Canales', 'Competencia', 'Diferenciación', 'Score Total',
+    'Landing URL', 'Landing Deployed', 'Created Date', 'Reasoning'
+]
+
+# Columnas del snapshot analítico (sin textos largos ni Reasoning)
+ANALYTICS_COLUMNS = [
+    'ID', 'Nombre', 'Tipo', 'Público Objetivo', 'Problema', 'Complejidad',
+    'Horas Desarrollo', 'Score Total', 'Landing URL', 'Landing Deployed', 'Created Date'
+]
+
+
+class IdeaStore:
+    """Log CSV append-only con vista newest-first y compactación"""
+
+    def __init__(self, csv_path='data/ideas-validadas.csv', state_path='data/ideas_store.json',
+                 analytics_path='data/ideas-analytics.csv'):
+        self.csv_path = csv_path
+        self.state_path = state_path
+        self.analytics_path = analytics_path
+        self.compact_every = int(os.getenv('STORE_COMPACT_EVERY', 100))
+        self.init_csv()
+
+    def init_csv(self):
+        if not os.path.exists(self.csv_path):
+            os.makedirs(os.path.dirname(self.csv_path) or '.', exist_ok=True)
+            pd.DataFrame(columns=COLUMNS).to_csv(self.csv_path, index=False, encoding='utf-8-sig')
+
+    def _load_state(self):
+        """
+        Estado del store. Si falta o está corrupto se parte de cero: sin
+        snapshot_csv_size el snapshot se considera obsoleto y se regenera del CSV
+        """
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            if isinstance(state, dict):
+                return state
+        except (OSError, ValueError):
+            pass
+        return {'appends_since_compact': 0}
+
+    def _save_state(self, state):
+        # Atómico: metrics_tracker también lo reescribe (refresh_snapshot) desde otro proceso
+        atomic_write_json(self.state_path, state)
+
+    def _ends_with_newline(self, path):
+        with open(path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() == 0:
+                return True
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b'\n'
+
+    def append(self, idea):
+        self.append_many([idea])
+
+    def _append_rows(self, path, columns, ideas):
+        needs_newline = not self._ends_with_newline(path)
+        with open(path, 'a', encoding='utf-8', newline='') as f:
+            if needs_newline:
+                f.write('\n')
+            writer = csv.writer(f, lineterminator='\n')
+            for idea in ideas:
+                writer.writerow(['' if idea.get(col) is None else idea.get(col) for col in columns])
+
+    def append_many(self, ideas):
+        """Añade ideas al final del CSV en una sola escritura"""
+        if not ideas:
+            return
+
+        state = self._load_state()
+        snapshot_fresh = not self._snapshot_is_stale(state)
+        self._append_rows(self.csv_path, COLUMNS, ideas)
+
+        # Snapshot incremental (si estaba al día; si no, se regenera al leer)
+        if snapshot_fresh:
+            self._append_rows(self.analytics_path, ANALYTICS_COLUMNS, ideas)
+            state['snapshot_csv_size'] = os.path.getsize(self.csv_path)
+
+        state['appends_since_compact'] = state.get('appends_since_compact', 0) + len(ideas)
+        self._save_state(state)
+
+        if self.compact_every > 0 and state['appends_since_compact'] >= self.compact_every:
+            self.compact()
+
+    def read(self, columns=None):
+        """Vista de lectura: ideas ordenadas de más reciente a más antigua"""
+        usecols = None
+        if columns is not None:
+            usecols = list(dict.fromkeys(list(columns) + ['Created Date']))
+
+        df = pd.read_csv(self.csv_path, encoding='utf-8-sig', usecols=usecols)
+        if not df.empty and 'Created Date' in df.columns:
+            df = df.sort_values('Created Date', ascending=False, kind='stable', na_position='last')
+            df = df.reset_index(drop=True)
+
+        if columns is not None:
+            df = df[list(columns)]
+        return df
+
+    def iter_rows(self):
+        """Recorre las ideas fila a fila (streaming, sin cargar el CSV entero)"""
+        with open(self.csv_path, 'r', encoding='utf-8-sig', newline='') as f:
+            for row in csv.DictReader(f):
+                yield row
+
+    def _snapshot_is_stale(self, state=None):
+        """El snapshot registra el tamaño del CSV que refleja (robusto ante checkouts)"""
+        if not os.path.exists(self.analytics_path):
+            return True
+        state = state if state is not None else self._load_state()
+        return state.get('snapshot_csv_size') != os.path.getsize(self.csv_path)
+
+    def _write_snapshot(self, df):
+        # Temporal por proceso: metrics_tracker puede regenerarlo a la vez
+        tmp_path = f"{self.analytics_path}.{os.getpid()}.tmp"
+        df[ANALYTICS_COLUMNS].to_csv(tmp_path, index=False, encoding='utf-8')
+        os.replace(tmp_path, self.analytics_path)
+
+        state = self._load_state()
+        state['snapshot_csv_size'] = os.path.getsize(self.csv_path)
+        self._save_state(state)
+
+    def refresh_snapshot(self):
+        """Regenera el snapshot analítico desde el CSV completo"""
+        self._write_snapshot(pd.read_csv(self.csv_path, encoding='utf-8-sig', usecols=ANALYTICS_COLUMNS))
+
+    def read_analytics(self, columns=None):
+        """Lectura rápida para analítica (snapshot ligero con proyección de columnas)"""
+        if self._snapshot_is_stale():
+            self.refresh_snapshot()
+        return pd.read_csv(self.analytics_path, encoding='utf-8', usecols=columns)
+
+    def compact(self):
+        """Reescribe el CSV en orden newest-first (coste O(N), sólo periódicamente)"""
+        df = self.read()
+        tmp_path = f"{self.csv_path}.tmp"
+        df.to_csv(tmp_path, index=False, encoding='utf-8-sig')
+        os.replace(tmp_path, self.csv_path)
+        self._save_state({'appends_since_compact': 0})
+        self._write_snapshot(df)
+        print(f"🗜️  CSV compactado: {len(df)} ideas")
+
+
+if __name__ == '__main__':
+    import sys
+
+    if '--compact' in sys.argv:
+        IdeaStore().compact()
+    else:
+        print("Uso: python idea_store.py --compact")
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Ideas API - JSON estático por idea para GitHub Pages
+- api/ideas/<ID>.json: ficha completa y estructurada de una idea (O(1) por idea)
+- api/by-month/<YYYY-MM>.json y api/by-score/<min>-<max>.json: listados por rangos
+- api/index.json: buckets disponibles y número de ideas en cada uno
+Cada deploy sólo toca la ficha de la idea, sus dos buckets y index.json
+"""
+import os
+import json
+import bisect
+
+from pages_manifest import get_manifest
+
+API_DIR = 'landing-pages/api'
+INDEX_PATH = f"{API_DIR}/index.json"
+PAGE_SIZE = int(os.getenv('API_PAGE_SIZE', 50))
+
+
+def _to_int(value, default=0):
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return default
+
+
+def _text(value):
+    # Celdas vacías del CSV llegan como NaN (float) al leer con pandas
+    if value is None or (isinstance(value, float) and value != value):
+        return ''
+    return str(value)
+
+
+def idea_record(idea):
+    """Ficha JSON de una idea (campos con nombres estables y tipos nativos)"""
+    return {
+        'id': _text(idea.get('ID')),
+        'nombre': _text(idea.get('Nombre')),
+        'tipo': _text(idea.get('Tipo')),
+        'resumen': _text(idea.get('Resumen')),
+        'descripcion': _text(idea.get('Descripción')),
+        'publico_objetivo': _text(idea.get('Público Objetivo')),
+        'problema': _text(idea.get('Problema')),
+        'solucion': _text(idea.get('Solución')),
+        'complejidad': _text(idea.get('Complejidad')),
+        'horas_desarrollo': _to_int(idea.get('Horas Desarrollo')),
+        'precio_estimado': _text(idea.get('Precio Estimado')),
+        'mvp_features': [f.strip() for f in _text(idea.get('MVP Features')).split(',') if f.strip()],
+        'canales': _text(idea.get('Canales')),
+        'competencia': _text(idea.get('Competencia')),
+        'diferenciacion': _text(idea.get('Diferenciación')),
+        'score': _to_int(idea.get('Score Total')),
+        'landing_url': _text(idea.get('Landing URL')),
+        'fecha': _text(idea.get('Created Date')),
+        'reasoning': _text(idea.get('Reasoning'))
+    }
+
+
+def listing_entry(record):
+    """Entrada de los listados: lo justo para enlazar a la ficha"""
+    return {
+        'id': record['id'],
+        'nombre': record['nombre'],
+        'tipo': record['tipo'],
+        'score': record['score'],
+        'fecha': record['fecha'],
+        'landing_url': record['landing_url'],
+        'url': f"ideas/{record['id']}.json"
+    }
+
+
+def month_bucket(record):
+    return record['fecha'][:7] or 'sin-fecha'
+
+
+def score_bucket(record):
+    # Un bucket por punto: la distribución está muy concentrada (70-79)
+    return str(record['score'])
+
+
+_BUCKETS = {
+    'by-month': month_bucket,
+    'by-score': score_bucket,
+}
+
+
+def _sort_key(entry):
+    return entry['fecha'], entry['id']
+
+
+def _dumps(data):
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+
+
+def _load(path, default):
+    if not os.path.exists(path):
+        return default
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def _page_path(kind, key, page):
+    return f"{API_DIR}/{kind}/{key}-{page}.json"
+
+
+def _pages(count, page_size):
+    return (count + page_size - 1) // page_size
+
+
+def _load_bucket(kind, key, count, page_size):
+    entries = []
+    for page in range(_pages(count, page_size)):
+        entries += _load(_page_path(kind, key, page), [])
+    return entries
+
+
+def _write_bucket(manifest, index, kind, key, entries, first_page, old_count):
+    """
+    Escribe las páginas del bucket desde first_page (entries empieza en ella),
+    borra las que sobran y actualiza el recuento en index
+    """
+    page_size = index['page_size']
+    count = first_page * page_size + len(entries)
+    for page in range(first_page, _pages(count, page_size)):
+        offset = (page - first_page) * page_size
+        manifest.write_if_changed(_page_path(kind, key, page), _dumps(entries[offset:offset + page_size]))
+    for page in range(_pages(count, page_size), _pages(old_count, page_size)):
+        manifest.remove(_page_path(kind, key, page))
+
+    if count:
+        index[kind][key] = count
+    else:
+        index[kind].pop(key, None)
+    index[kind] = dict(sorted(index[kind].items()))
+
+
+def _insert_into_bucket(manifest, index, kind, key, entry, present):
+    """
+    Caso normal (idea nueva, la más reciente del bucket): sólo se reescribe la
+    última página. Si la idea ya estaba en el bucket o es anterior a la última,
+    se carga el bucket y se reescribe desde su posición
+    """
+    page_size = index['page_size']
+    count = index[kind].get(key, 0)
+    first_page = max(count - 1, 0) // page_size
+    entries = _load(_page_path(kind, key, first_page), []) if count else []
+
+    if present or (entries and _sort_key(entry) < _sort_key(entries[-1])):
+        first_page = 0
+        entries = [e for e in _load_bucket(kind, key, count, page_size) if e['id'] != entry['id']]
+
+    position = bisect.bisect_right(entries, _sort_key(entry), key=_sort_key)
+    entries.insert(position, entry)
+    # Las páginas anteriores a la de la posición no cambian
+    skip = position // page_size
+    _write_bucket(manifest, index, kind, key, entries[skip * page_size:], first_page + skip, count)
+
+
+def _remove_from_bucket(manifest, index, kind, key, idea_id):
+    count = index[kind].get(key, 0)
+    entries = _load_bucket(kind, key, count, index['page_size'])
+    _write_bucket(manifest, index, kind, key, [e for e in entries if e['id'] != idea_id], 0, count)
+
+
+def write_idea(idea, manifest=None):
+    """Publica (o actualiza) una idea: su ficha, sus buckets e index.json"""
+    manifest = manifest or get_manifest()
+    index = _load(INDEX_PATH, None)
+    if index is None or 'page_size' not in index:
+        # API sin publicar o con el formato anterior
+        rebuild_api()
+        index = _load(INDEX_PATH, None)
+
+    record = idea_record(idea)
+    entry = listing_entry(record)
+    record_path = f"{API_DIR}/{entry['url']}"
+
+    previous = _load(record_path, None)
+    manifest.write_if_changed(record_path, _dumps(record))
+    if previous is None:
+        index['total'] += 1
+
+    for kind, bucket_of in _BUCKETS.items():
+        key = bucket_of(record)
+        present = previous is not None and bucket_of(previous) == key
+        # Si la idea cambia de bucket (p.ej. score re-evaluado), sale del anterior
+        if previous is not None and not present:
+            _remove_from_bucket(manifest, index, kind, bucket_of(previous), entry['id'])
+        _insert_into_bucket(manifest, index, kind, key, entry, present)
+
+    manifest.write_if_changed(INDEX_PATH, _dumps(index))
+
+
+def rebuild_api(csv_path='data/ideas-validadas.csv'):
+    """Reconstrucción completa desde el store (sólo reescribe lo que cambia)"""
+    from idea_store import IdeaStore
+
+    manifest = get_manifest()
+    buckets = {kind: {} for kind in _BUCKETS}
+    seen = set()
+
+    for row in IdeaStore(csv_path).iter_rows():
+        record = idea_record(row)
+        if not record['id'] or record['id'] in seen:
+            continue
+        seen.add(record['id'])
+        manifest.write_if_changed(f"{API_DIR}/ideas/{record['id']}.json", _dumps(record))
+        for kind, bucket_of in _BUCKETS.items():
+            buckets[kind].setdefault(bucket_of(record), []).append(listing_entry(record))
+
+    index = {'total': len(seen), 'page_size': PAGE_SIZE}
+    for kind, by_key in buckets.items():
+        index[kind] = {}
+        for key, entries in by_key.items():
+            entries.sort(key=_sort_key)
+            _write_bucket(manifest, index, kind, key, entries, 0, len(entries))
+
+        # Páginas de buckets que ya no existen (o de un formato anterior)
+        written = {
+            f"{key}-{page}.json"
+            for key, count in index[kind].items() for page in range(_pages(count, PAGE_SIZE))
+        }
+        kind_dir = f"{API_DIR}/{kind}"
+        for name in sorted(os.listdir(kind_dir)) if os.path.isdir(kind_dir) else []:
+            if name not in written:
+                manifest.remove(f"{kind_dir}/{name}")
+
+    manifest.write_if_changed(INDEX_PATH, _dumps(index))
+    manifest.save()
+    print(f"✅ API JSON reconstruida: {len(seen)} ideas")
+    return len(seen)
+
+
+if __name__ == '__main__':
+    import sys
+
+    if '--rebuild' in sys.argv:
+        rebuild_api()
+    else:
+        print("Uso: python ideas_api.py --rebuild")
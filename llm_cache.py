@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+LLM Cache - Caché de completions y modo record/replay
+- CachedClient: caché en disco direccionada por contenido
+  (modelo + mensajes + temperatura + formato) con expiración TTL y LRU
+- RecordingClient: llamadas reales que se guardan en un fichero de fixtures
+- ReplayClient: cliente local sin red que sirve respuestas desde fixtures
+El modo se elige con LLM_MODE: live (defecto), cache, record, replay.
+Los tres clientes admiten stream=True: sirven la respuesta guardada en chunks
+y sólo guardan/graban los streams que llegan completos (no los abortados)
+"""
+import os
+import json
+import time
+import hashlib
+from types import SimpleNamespace
+
+from file_utils import atomic_write_json
+
+CACHE_DIR = 'data/llm_cache'
+FIXTURES_PATH = 'data/llm_fixtures.jsonl'
+
+
+def request_key(kwargs):
+    """Clave estable de una petición de chat completion"""
+    payload = {
+        'model': kwargs.get('model'),
+        'messages': kwargs.get('messages'),
+        'temperature': kwargs.get('temperature'),
+        'response_format': kwargs.get('response_format'),
+    }
+    raw = json.dumps(payload, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def make_response(content, model=None):
+    """Respuesta mínima con la forma de ChatCompletion (choices[0].message.content)"""
+    message = SimpleNamespace(role='assistant', content=content)
+    choice = SimpleNamespace(index=0, message=message, finish_reason='stop')
+    return SimpleNamespace(model=model, choices=[choice], usage=None)
+
+
+def make_chunk(content=None, finish_reason=None, model=None):
+    """Chunk con la forma de ChatCompletionChunk (choices[0].delta.content)"""
+    delta = SimpleNamespace(role='assistant', content=content)
+    choice = SimpleNamespace(index=0, delta=delta, finish_reason=finish_reason)
+    return SimpleNamespace(model=model, choices=[choice], usage=None)
+
+
+def make_stream(content, model=None, chunk_size=None):
+    """Emite una respuesta guardada como stream (trozos de LLM_STREAM_CHUNK caracteres)"""
+    chunk_size = int(chunk_size or os.getenv('LLM_STREAM_CHUNK', 16))
+    for i in range(0, len(content), chunk_size):
+        yield make_chunk(content[i:i + chunk_size], model=model)
+    yield make_chunk(finish_reason='stop', model=model)
+
+
+def tee_stream(stream, on_complete):
+    """
+    Re-emite los chunks de un stream y, si termina con finish_reason='stop',
+    llama a on_complete(contenido). Si el consumidor lo cierra antes (abort),
+    se cierra también el stream de origen y no se guarda nada
+    """
+    parts = []
+    finished = False
+    try:
+        for chunk in stream:
+            for choice in chunk.choices or []:
+                if choice.delta.content:
+                    parts.append(choice.delta.content)
+                if choice.finish_reason == 'stop':
+                    finished = True
+            yield chunk
+    finally:
+        close = getattr(stream, 'close', None)
+        if close:
+            close()
+
+    if finished:
+        on_complete("".join(parts))
+
+
+class _CompletionsClient:
+    """Base: expone client.chat.completions.create(**kwargs) como el SDK"""
+
+    def __init__(self):
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **kwargs):
+        raise NotImplementedError
+
+
+class CachedClient(_CompletionsClient):
+    """Envuelve un cliente OpenAI con caché en disco (TTL + LRU)"""
+
+    def __init__(self, client, cache_dir=CACHE_DIR, ttl=None, max_entries=None):
+        super().__init__()
+        self.client = client
+        self.cache_dir = cache_dir
+        self.ttl = float(ttl if ttl is not None else os.getenv('LLM_CACHE_TTL', 7 * 24 * 3600))
+        self.max_entries = int(max_entries if max_entries is not None else os.getenv('LLM_CACHE_MAX_ENTRIES', 500))
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if time.time() - entry.get('created', 0) > self.ttl:
+            os.unlink(path)
+            return None
+
+        # LRU: el mtime marca el último acceso
+        os.utime(path)
+        return entry
+
+    def put(self, key, model, content):
+        atomic_write_json(self._path(key), {
+            'created': time.time(),
+            'model': model,
+            'content': content
+        })
+        self.evict()
+
+    def evict(self):
+        """Elimina las entradas menos usadas recientemente por encima del límite"""
+        entries = [
+            os.path.join(self.cache_dir, name)
+            for name in os.listdir(self.cache_dir) if name.endswith('.json')
+        ]
+        if len(entries) <= self.max_entries:
+            return
+        entries.sort(key=os.path.getmtime)
+        for path in entries[:len(entries) - self.max_entries]:
+            os.unlink(path)
+
+    def create(self, **kwargs):
+        key = request_key(kwargs)
+        entry = self.get(key)
+        if entry is not None:
+            self.hits += 1
+            if kwargs.get('stream'):
+                return make_stream(entry['content'], entry.get('model'))
+            return make_response(entry['content'], entry.get('model'))
+
+        self.misses += 1
+        response = self.client.chat.completions.create(**kwargs)
+        if kwargs.get('stream'):
+            return tee_stream(response, lambda content: self.put(key, kwargs.get('model'), content))
+        self.put(key, kwargs.get('model'), response.choices[0].message.content)
+        return response
+
+
+class RecordingClient(_CompletionsClient):
+    """Hace llamadas reales y las añade al fichero de fixtures"""
+
+    def __init__(self, client, fixtures_path=FIXTURES_PATH):
+        super().__init__()
+        self.client = client
+        self.fixtures_path = fixtures_path
+
+    def _record(self, kwargs, content):
+        os.makedirs(os.path.dirname(self.fixtures_path) or '.', exist_ok=True)
+        with open(self.fixtures_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({
+                'key': request_key(kwargs),
+                'model': kwargs.get('model'),
+                'content': content
+            }, ensure_ascii=False) + '\n')
+
+    def create(self, **kwargs):
+        response = self.client.chat.completions.create(**kwargs)
+        if kwargs.get('stream'):
+            return tee_stream(response, lambda content: self._record(kwargs, content))
+        self._record(kwargs, response.choices[0].message.content)
+        return response
+
+
+class ReplayClient(_CompletionsClient):
+    """
+    Cliente local sin red: sirve las respuestas grabadas.
+    Busca primero por clave exacta; si el prompt ha cambiado (fecha, memoria...)
+    y strict=False, devuelve las grabaciones en orden, de forma determinista.
+    """
+
+    def __init__(self, fixtures_path=FIXTURES_PATH, strict=False):
+        super().__init__()
+        self.strict = strict
+        self.by_key = {}
+        self.sequence = []
+        self.position = 0
+
+        with open(fixtures_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    self.by_key.setdefault(record['key'], []).append(record)
+                    self.sequence.append(record)
+
+        if not self.sequence:
+            raise ValueError(f"Fichero de fixtures vacío: {fixtures_path}")
+
+    def create(self, **kwargs):
+        records = self.by_key.get(request_key(kwargs))
+        if records:
+            # Rotar si la misma petición se grabó varias veces
+            record = records.pop(0)
+            records.append(record)
+        elif self.strict:
+            raise KeyError("Petición no grabada en fixtures (replay estricto)")
+        else:
+            record = self.sequence[self.position % len(self.sequence)]
+            self.position += 1
+
+        if kwargs.get('stream'):
+            return make_stream(record['content'], record.get('model'))
+        return make_response(record['content'], record.get('model'))
+
+
+def build_openai_client(api_key=None, mode=None):
+    """Crea el cliente según LLM_MODE (live, cache, record, replay)"""
+    mode = (mode or os.getenv('LLM_MODE', 'live')).lower()
+    fixtures_path = os.getenv('LLM_FIXTURES', FIXTURES_PATH)
+
+    if mode == 'replay':
+        strict = os.getenv('LLM_REPLAY_STRICT', 'false').lower() == 'true'
+        return ReplayClient(fixtures_path, strict=strict)
+
+    from openai import OpenAI
+    client = OpenAI(api_key=api_key)
+
+    if mode == 'cache':
+        return CachedClient(client)
+    if mode == 'record':
+        return RecordingClient(client, fixtures_path)
+    if mode != 'live':
+        raise ValueError(f"LLM_MODE desconocido: {mode}")
+    return client
@@ -3,11 +3,11 @@
 Metrics Tracker - Sistema de seguimiento de métricas
 CORREGIDO: Manejo robusto de columnas
 """
-import pandas as pd
 import time
 import os
 from datetime import datetime
 from collections import Counter
+from idea_store import IdeaStore
 
 def track_metrics():
     csv_path = 'data/ideas-validadas.csv'
@@ -17,7 +17,8 @@ def track_metrics():
         return
 
     try:
-        df = pd.read_csv(csv_path, encoding='utf-8-sig')
+        # Snapshot analítico: sin Reasoning ni textos largos
+        df = IdeaStore(csv_path).read_analytics(['Score Total', 'Tipo', 'Landing Deployed', 'Landing URL'])
 
         if df.empty:
             print("📊 No hay ideas aún. Esperando...")
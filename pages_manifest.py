@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Pages Manifest - Hashes de contenido de los ficheros publicados
+- Evita reescribir ficheros byte-idénticos
+- Registra qué ficheros han cambiado para que el pipeline
+  sólo tenga que añadir (git add) el delta
+El manifest se guarda con una entrada por línea y ordenado (diff mínimo en
+git) y sólo cuando cambian hashes; la lista de cambios va en un fichero aparte
+"""
+import os
+import json
+import hashlib
+
+from file_utils import atomic_write_json, atomic_write_text
+
+MANIFEST_PATH = 'data/pages_manifest.json'
+CHANGED_PATH = 'data/pages_changed.json'
+
+
+def content_digest(content):
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def _read_json(path, default):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return data if isinstance(data, type(default)) else default
+    except (OSError, ValueError):
+        return default
+
+
+def _file_digest(path):
+    try:
+        with open(path, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+class PagesManifest:
+    """Manifest {ruta: sha256} + lista de ficheros cambiados pendientes"""
+
+    def __init__(self, path=MANIFEST_PATH, changed_path=CHANGED_PATH):
+        self.path = path
+        self.changed_path = changed_path
+        self.files = {}
+        self.changed = []
+        self.dirty = False
+        self.changed_dirty = False
+        self.load()
+
+    def load(self):
+        self.files = _read_json(self.path, {}).get('files', {})
+        self.changed = _read_json(self.changed_path, [])
+
+    def _mark_changed(self, path):
+        if path not in self.changed:
+            self.changed.append(path)
+            self.changed_dirty = True
+
+    def save(self):
+        if self.dirty:
+            atomic_write_json(self.path, {'files': dict(sorted(self.files.items()))}, indent=0)
+            self.dirty = False
+        if self.changed_dirty:
+            atomic_write_json(self.changed_path, self.changed)
+            self.changed_dirty = False
+
+    def is_current(self, path, digest):
+        """True si el fichero en disco ya tiene ese contenido"""
+        if not os.path.exists(path):
+            return False
+        known = self.files.get(path)
+        if known is None:
+            # Fichero anterior al manifest: se comprueba una vez contra el disco
+            known = _file_digest(path)
+            if known == digest:
+                self.files[path] = digest
+                self.dirty = True
+        return known == digest
+
+    def write_if_changed(self, path, content, digest=None):
+        """Escribe el fichero sólo si su contenido cambia. Devuelve True si escribió"""
+        digest = digest or content_digest(content)
+        if self.is_current(path, digest):
+            return False
+
+        atomic_write_text(path, content)
+        self.files[path] = digest
+        self._mark_changed(path)
+        self.dirty = True
+        return True
+
+    def remove(self, path):
+        """Borra un fichero publicado; queda en la lista de cambios para darlo de baja en git"""
+        existed = os.path.exists(path)
+        if existed:
+            os.remove(path)
+        known = self.files.pop(path, None) is not None
+        if known:
+            self.dirty = True
+        if existed or known:
+            self._mark_changed(path)
+
+    def pop_changed(self):
+        """Devuelve y vacía la lista de ficheros cambiados desde la última consulta"""
+        changed = self.changed
+        if changed:
+            self.changed = []
+            self.changed_dirty = True
+            self.save()
+        return changed
+
+
+_manifest = None
+
+
+def get_manifest():
+    """Manifest compartido por el proceso"""
+    global _manifest
+    if _manifest is None:
+        _manifest = PagesManifest()
+    return _manifest
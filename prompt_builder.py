@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Prompt Builder - Ensamblado del prompt de generación de ideas
+- Bloque de instrucciones estático: se construye una sola vez
+- Secciones de contexto (insights, ideas exitosas) memoizadas por la
+  versión de la memoria: sólo se recalculan cuando la memoria cambia
+- Presupuesto de tokens (PROMPT_TOKEN_BUDGET): si se supera, se recortan
+  primero las secciones de menor prioridad, línea a línea
+- Informe por llamada con los tokens de cada sección
+"""
+import os
+import threading
+
+from exclusion_digest import estimate_tokens
+
+PROMPT_HEADER = """Eres un experto analista de productos digitales y validación de ideas de negocio.
+
+CONTEXTO DEL SISTEMA:"""
+
+PROMPT_TASK = """TAREA:
+Genera UNA idea de producto digital viable y con potencial comercial.
+
+PROCESO DE RAZONAMIENTO (piensa paso a paso):
+
+1. IDENTIFICACIÓN DEL PROBLEMA
+   - ¿Qué problema real existe?
+   - ¿Quién lo sufre?
+   - ¿Por qué no se ha resuelto bien?
+
+2. ANÁLISIS DE OPORTUNIDAD
+   - ¿Por qué es buen momento AHORA?
+   - ¿Qué hace única esta solución?
+   - ¿Hay mercado suficiente?
+
+3. DEFINICIÓN DEL PRODUCTO
+   - Tipo: SaaS, Extension, MicroSaaS, Plantilla, o InfoProducto
+   - Nombre memorable y claro
+   - Propuesta de valor única
+   - MVP mínimo viable
+
+4. VIABILIDAD TÉCNICA
+   - Complejidad real (Baja/Media/Alta)
+   - Horas estimadas realistas
+   - Stack tecnológico necesario
+
+5. VIABILIDAD COMERCIAL
+   - Público objetivo específico
+   - Canales de adquisición
+   - Precio estimado justificado
+   - Competencia y diferenciación
+
+6. SCORING OBJETIVO
+   - Puntúa del 40 al 90 basado en:
+     * Demanda real del mercado (0-30 pts)
+     * Viabilidad técnica (0-30 pts)
+     * Potencial comercial (0-30 pts)
+
+Devuelve en formato JSON:
+{
+  "reasoning": {
+    "problema_identificado": "...",
+    "porque_ahora": "...",
+    "oportunidad": "...",
+    "diferenciacion": "..."
+  },
+  "idea": {
+    "nombre": "...",
+    "tipo": "SaaS|Extension|MicroSaaS|Plantilla|InfoProducto",
+    "resumen": "...",
+    "descripcion": "...",
+    "publico_objetivo": "...",
+    "problema": "...",
+    "solucion": "...",
+    "complejidad": "Baja|Media|Alta",
+    "horas_desarrollo": 20-200,
+    "precio_estimado": "$X/mes o $X one-time",
+    "mvp_features": "Feature 1, Feature 2, Feature 3",
+    "canales": "Canal 1, Canal 2, Canal 3",
+    "competencia": "...",
+    "diferenciacion": "...",
+    "score": 40-90
+  }
+}
+
+Sé HONESTO en el scoring. No todas las ideas son brillantes.
+"""
+
+# Orden en el prompt y prioridad al recortar (mayor = se conserva más)
+SECTIONS = [
+    ('insights', 1),
+    ('success', 2),
+    ('trends', 3),
+    ('digest', 4),
+]
+
+# Secciones cuya primera línea es una cabecera (sin más líneas no aportan nada)
+HEADED_SECTIONS = {'success', 'trends', 'digest'}
+
+
+class PromptBuilder:
+    """Construye el prompt de generación respetando un presupuesto de tokens"""
+
+    def __init__(self, memory, token_budget=None):
+        self.memory = memory
+        self.token_budget = int(token_budget if token_budget is not None else os.getenv('PROMPT_TOKEN_BUDGET', 1500))
+        # Instrucciones fijas + separadores entre secciones
+        self.static_tokens = (estimate_tokens(PROMPT_HEADER) + estimate_tokens(PROMPT_TASK)
+                              + estimate_tokens("\n\n" * (len(SECTIONS) + 1)))
+        self._memo = {}
+        self._lock = threading.Lock()
+        self.last_report = None
+
+    def _memoized(self, name, build):
+        """Sección derivada de la memoria: se recalcula sólo si cambió la versión"""
+        version = self.memory.version
+        cached = self._memo.get(name)
+        if cached is None or cached[0] != version:
+            cached = (version, build())
+            self._memo[name] = cached
+        return cached[1]
+
+    def _insights_section(self):
+        insights = self.memory.get_insights()
+        return "\n".join(insights) if insights else "Primera idea"
+
+    def _success_section(self):
+        success_factors = self.memory.memory['patterns'].get('success_factors', [])
+        if not success_factors:
+            return ""
+        lines = ["Ideas exitosas previas:"]
+        lines += [f"- {sf['tipo']}: {sf['nombre']} (score {sf['score']})" for sf in success_factors[:3]]
+        return "\n".join(lines)
+
+    @staticmethod
+    def _trim_lines(text, max_tokens, has_header=False):
+        """Recorta una sección por líneas (desde el final) hasta que quepa"""
+        lines = text.split("\n")
+        while lines and estimate_tokens("\n".join(lines)) > max_tokens:
+            lines.pop()
+        # Una cabecera sola no aporta nada
+        if has_header and len(lines) < 2:
+            return ""
+        return "\n".join(lines)
+
+    def build(self, trends_context="", exclusion_digest=""):
+        """Devuelve (prompt, informe de tokens por sección)"""
+        with self._lock:
+            sections = {
+                'insights': self._memoized('insights', self._insights_section),
+                'success': self._memoized('success', self._success_section),
+                'trends': trends_context.strip(),
+                'digest': exclusion_digest.strip(),
+            }
+
+        tokens = {name: estimate_tokens(text) for name, text in sections.items()}
+        trimmed = []
+        available = self.token_budget - self.static_tokens
+
+        # Recorte por prioridad: de la sección menos importante a la más importante
+        for name, _ in sorted(SECTIONS, key=lambda s: s[1]):
+            excess = sum(tokens.values()) - available
+            if excess <= 0:
+                break
+            if not sections[name]:
+                continue
+            sections[name] = self._trim_lines(sections[name], max(tokens[name] - excess, 0),
+                                              name in HEADED_SECTIONS)
+            tokens[name] = estimate_tokens(sections[name])
+            trimmed.append(name)
+
+        parts = [PROMPT_HEADER]
+        parts += [sections[name] for name, _ in SECTIONS if sections[name]]
+        parts.append(PROMPT_TASK)
+        prompt = "\n\n".join(parts)
+
+        report = {
+            'total': estimate_tokens(prompt),
+            'budget': self.token_budget,
+            'static': self.static_tokens,
+            'sections': tokens,
+            'trimmed': trimmed
+        }
+        self.last_report = report
+        return prompt, report
+
+    @staticmethod
+    def format_report(report):
+        sections = ', '.join(f"{name} {n}" for name, n in report['sections'].items() if n)
+        line = f"📏 Prompt ~{report['total']} tokens (estático {report['static']}, {sections or 'sin contexto'})"
+        if report['trimmed']:
+            line += f" - recortado: {', '.join(report['trimmed'])}"
+        return line
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Search Index - Índice invertido estático para el buscador de index.html
+- Tokens de nombre, resumen y tipo, sin acentos (búsqueda en español)
+- Postings: números de documento = posición en la vista cronológica
+  (el documento n está en index/date-{n // page_size}.json)
+- Particionado por prefijo de 2 caracteres: el navegador sólo descarga
+  los shards de lo que se escribe
+- Las ideas nuevas (al final de la vista cronológica) se añaden sin
+  reconstruir: sólo se reescriben los shards de sus tokens
+"""
+import re
+import json
+import unicodedata
+from collections import defaultdict
+
+SEARCH_DIR = 'landing-pages/search'
+PREFIX_LEN = 2
+
+STOPWORDS = {
+    'al', 'con', 'de', 'del', 'el', 'en', 'es', 'la', 'las', 'lo', 'los',
+    'mas', 'para', 'por', 'que', 'se', 'sin', 'su', 'sus', 'un', 'una', 'y'
+}
+
+
+def fold(text):
+    """Minúsculas y sin acentos (misma normalización que el cliente JS)"""
+    decomposed = unicodedata.normalize('NFKD', str(text))
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).lower()
+
+
+def tokenize(text):
+    """Tokens buscables; los nombres CamelCase se indexan también por partes"""
+    text = str(text)
+    split_camel = re.sub(r'([a-záéíóúñ])([A-ZÁÉÍÓÚÑ])', r'\1 \2', text)
+    tokens = set(re.findall(r'[a-z0-9]+', fold(text)))
+    tokens.update(re.findall(r'[a-z0-9]+', fold(split_camel)))
+    return {t for t in tokens if len(t) >= PREFIX_LEN and t not in STOPWORDS}
+
+
+def entry_tokens(entry):
+    return sorted(tokenize(f"{entry['nombre']} {entry['resumen']} {entry['tipo']}"))
+
+
+def build_postings(entries):
+    """{prefijo: {token: [doc, ...]}} para entradas en orden cronológico"""
+    shards = defaultdict(lambda: defaultdict(list))
+    for doc, entry in enumerate(entries):
+        for token in entry_tokens(entry):
+            shards[token[:PREFIX_LEN]][token].append(doc)
+    return shards
+
+
+def _write_shard(manifest, prefix, postings):
+    manifest.write_if_changed(
+        f"{SEARCH_DIR}/{prefix}.json",
+        json.dumps(postings, ensure_ascii=False, separators=(',', ':'), sort_keys=True)
+    )
+
+
+def write_search_index(entries_by_date, manifest):
+    """Escribe los shards del índice (sólo los que cambian). Devuelve los prefijos existentes"""
+    shards = build_postings(entries_by_date)
+    for prefix, postings in shards.items():
+        _write_shard(manifest, prefix, postings)
+    return sorted(shards)
+
+
+def append_to_search_index(first_doc, entries, prefixes, manifest):
+    """
+    Añade documentos nuevos al final de la vista cronológica (docs
+    first_doc, first_doc + 1, ...): sólo se leen y reescriben los shards
+    de sus tokens. Devuelve los prefijos existentes, o None si falta un shard
+    """
+    prefixes = set(prefixes)
+    touched = {}
+    for doc, entry in enumerate(entries, first_doc):
+        for token in entry_tokens(entry):
+            prefix = token[:PREFIX_LEN]
+            if prefix not in touched:
+                postings = {}
+                if prefix in prefixes:
+                    try:
+                        with open(f"{SEARCH_DIR}/{prefix}.json", 'r', encoding='utf-8') as f:
+                            postings = json.load(f)
+                    except (OSError, ValueError):
+                        return None
+                touched[prefix] = postings
+            touched[prefix].setdefault(token, []).append(doc)
+
+    for prefix, postings in touched.items():
+        _write_shard(manifest, prefix, postings)
+    return sorted(prefixes | set(touched))
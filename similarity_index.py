@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Similarity Index - Búsqueda sublineal de ideas casi duplicadas
+- TrigramIndex: nombres (índice invertido de trigramas)
+- MinHashLSHIndex: descripciones (MinHash + LSH sobre shingles de caracteres)
+Los índices sólo devuelven candidatos; el scoring exacto lo hace IdeaTracker
+"""
+import zlib
+import numpy as np
+from collections import defaultdict
+
+
+class SimilarityIndex:
+    """Interfaz común: añadir textos y obtener candidatos similares"""
+
+    def add(self, key, text):
+        raise NotImplementedError
+
+    def candidates(self, text):
+        """Devuelve las claves candidatas ordenadas por orden de inserción"""
+        raise NotImplementedError
+
+    def __len__(self):
+        return 0
+
+
+class TrigramIndex(SimilarityIndex):
+    """Índice invertido de trigramas para textos cortos (nombres)"""
+
+    def __init__(self, min_overlap=0.4):
+        # Fracción mínima de trigramas de la consulta que debe compartir un candidato
+        self.min_overlap = min_overlap
+        self.postings = defaultdict(list)
+        self.count = 0
+
+    @staticmethod
+    def trigrams(text):
+        padded = f"  {text.lower()} "
+        return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+    def add(self, key, text):
+        for gram in self.trigrams(text):
+            self.postings[gram].append(key)
+        self.count += 1
+
+    def candidates(self, text):
+        grams = self.trigrams(text)
+        shared = defaultdict(int)
+        for gram in grams:
+            for key in self.postings.get(gram, ()):
+                shared[key] += 1
+
+        needed = max(1, int(len(grams) * self.min_overlap))
+        return sorted(key for key, n in shared.items() if n >= needed)
+
+    def __len__(self):
+        return self.count
+
+
+class MinHashLSHIndex(SimilarityIndex):
+    """MinHash + LSH por bandas para textos largos (descripciones)"""
+
+    def __init__(self, shingle_size=5, num_perm=128, bands=64, min_jaccard=0.2, seed=42):
+        if num_perm % bands:
+            raise ValueError("num_perm debe ser múltiplo de bands")
+
+        self.shingle_size = shingle_size
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        # Jaccard estimado mínimo para pasar al re-scoring exacto
+        self.min_jaccard = min_jaccard
+
+        # Hashing multiply-shift (universal) sobre uint64
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, 2**63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2**63, size=num_perm, dtype=np.uint64)
+
+        self.buckets = [defaultdict(list) for _ in range(bands)]
+        self.signatures = {}
+
+    def _shingles(self, text):
+        text = ' '.join(text.lower().split())
+        k = self.shingle_size
+        if len(text) <= k:
+            return {text}
+        return {text[i:i + k] for i in range(len(text) - k + 1)}
+
+    def signature(self, text):
+        hashes = np.fromiter(
+            (zlib.crc32(s.encode('utf-8')) for s in self._shingles(text)),
+            dtype=np.uint64
+        )
+        with np.errstate(over='ignore'):
+            permuted = (hashes[:, None] * self._a + self._b) >> np.uint64(32)
+        return permuted.min(axis=0)
+
+    def _band_keys(self, signature):
+        r = self.rows
+        return [signature[i * r:(i + 1) * r].tobytes() for i in range(self.bands)]
+
+    def add(self, key, text):
+        signature = self.signature(text)
+        self.signatures[key] = signature
+        for bucket, band_key in zip(self.buckets, self._band_keys(signature)):
+            bucket[band_key].append(key)
+
+    def candidates(self, text):
+        signature = self.signature(text)
+        found = set()
+        for bucket, band_key in zip(self.buckets, self._band_keys(signature)):
+            found.update(bucket.get(band_key, ()))
+
+        if not found:
+            return []
+
+        # Filtrar por Jaccard estimado con la firma completa (vectorizado)
+        keys = sorted(found)
+        matrix = np.stack([self.signatures[key] for key in keys])
+        estimated = (matrix == signature).mean(axis=1)
+        return [key for key, j in zip(keys, estimated) if j >= self.min_jaccard]
+
+    def __len__(self):
+        return len(self.signatures)
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Stream Parser - Lectura incremental de la respuesta JSON en streaming
+- Extrae los campos decisivos de la idea (nombre, descripcion, score) en
+  cuanto están completos, sin esperar al final del documento
+- Cada campo se localiza una sola vez y sólo se vuelve a examinar desde su
+  clave: el coste por chunk no crece con la longitud de la respuesta
+Permite cortar la petición en cuanto un campo ya decide el rechazo
+"""
+import re
+import json
+
+STRING_FIELDS = ('nombre', 'descripcion')
+NUMBER_FIELDS = ('score',)
+
+_STRING_VALUE = r'"{}"\s*:\s*"((?:[^"\\]|\\.)*)"'
+# El número sólo está completo cuando le sigue un separador
+_NUMBER_VALUE = r'"{}"\s*:\s*(-?\d+(?:\.\d+)?)\s*[,}}]'
+
+
+class StreamingIdeaParser:
+    """Acumula los chunks y publica los campos de la idea según se completan"""
+
+    def __init__(self):
+        self.text = ""
+        self.fields = {}
+        self._key_pos = {}
+        self._patterns = {
+            name: re.compile(_STRING_VALUE.format(name)) for name in STRING_FIELDS
+        }
+        self._patterns.update({
+            name: re.compile(_NUMBER_VALUE.format(name)) for name in NUMBER_FIELDS
+        })
+
+    def feed(self, chunk):
+        """Añade un chunk y devuelve los nombres de los campos recién completados"""
+        previous = len(self.text)
+        self.text += chunk
+        text = self.text
+
+        new = []
+        for name, pattern in self._patterns.items():
+            if name in self.fields:
+                continue
+
+            key = f'"{name}"'
+            if name not in self._key_pos:
+                # La clave puede haber quedado partida entre dos chunks
+                pos = text.find(key, max(previous - len(key), 0))
+                if pos < 0:
+                    continue
+                self._key_pos[name] = pos
+
+            match = pattern.match(text, self._key_pos[name])
+            if not match:
+                continue
+
+            value = match.group(1)
+            if name in STRING_FIELDS:
+                value = json.loads(f'"{value}"')
+            else:
+                value = float(value) if '.' in value else int(value)
+            self.fields[name] = value
+            new.append(name)
+
+        return new
+
+    def result(self):
+        """Documento completo (al terminar el stream)"""
+        return json.loads(self.text)